@@ -1,17 +1,23 @@
 import csv
 import math
+import numpy as np
 from typing import List, Tuple, Dict, Optional, Set
 import networkx as nx
 import matplotlib.pyplot as plt
 import folium
 from folium import plugins
+from pydantic import TypeAdapter
 from models import ChargingStation
 import json
+import orjson
 import time
+from functools import lru_cache
 from typing import Dict, Any
 import requests
 from typing import Tuple, Optional
 
+_STATION_LIST_ADAPTER = TypeAdapter(List[ChargingStation])
+
 
 def load_charging_stations(file_path: str) -> List[ChargingStation]:
     """
@@ -23,27 +29,112 @@ def load_charging_stations(file_path: str) -> List[ChargingStation]:
     Returns:
         List of ChargingStation objects
     """
-    charging_stations = []
-    
     with open(file_path, 'r') as csvfile:
         reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Clean and convert the price field (remove € symbol)
-            price_str = row['price_€/kWh'].replace('€', '')
+        # Numeric strings are left for pydantic to coerce while validating the whole list at once
+        rows = [
+            {
+                "id": row['ID'],
+                "country": row['country'],
+                "latitude": row['latitude'],
+                "longitude": row['longitude'],
+                "truck_suitability": row['truck_suitability'],
+                "operator_name": row['operator_name'],
+                "max_power_kW": row['max_power_kW'],
+                # Clean the price field (remove € symbol)
+                "price_per_kWh": row['price_€/kWh'].replace('€', '')
+            }
+            for row in reader
+        ]
+    
+    return _STATION_LIST_ADAPTER.validate_python(rows)
+
+
+class ChargingStationTable:
+    """
+    Column-oriented view of a charging station list for vectorized queries.
+    
+    Numeric columns are float32 NumPy arrays (lat/lon rounding costs about 1 m),
+    string columns are object arrays, and row i of every column describes
+    stations[i]. The ChargingStation objects are kept for the per-row API.
+    """
+    
+    def __init__(self, stations: List[ChargingStation]):
+        self.stations = stations
+        self.ids = np.array([s.id for s in stations], dtype=np.int64)
+        self.lat = np.array([s.latitude for s in stations], dtype=np.float32)
+        self.lon = np.array([s.longitude for s in stations], dtype=np.float32)
+        self.power = np.array([s.max_power_kW for s in stations], dtype=np.float32)
+        self.price = np.array([s.price_per_kWh for s in stations], dtype=np.float32)
+        self.country = np.array([s.country for s in stations], dtype=object)
+        self.truck_suitability = np.array([s.truck_suitability for s in stations], dtype=object)
+        self.operator_name = np.array([s.operator_name for s in stations], dtype=object)
+    
+    def __len__(self) -> int:
+        return len(self.stations)
+    
+    def __getitem__(self, index: int) -> ChargingStation:
+        return self.stations[index]
+    
+    def min_distance_km(self, points: List[Tuple[float, float]]) -> np.ndarray:
+        """
+        Haversine distance from every station to its closest point in a list
+        
+        Args:
+            points: List of (latitude, longitude) points
             
-            station = ChargingStation(
-                id=int(row['ID']),
-                country=row['country'],
-                latitude=float(row['latitude']),
-                longitude=float(row['longitude']),
-                truck_suitability=row['truck_suitability'],
-                operator_name=row['operator_name'],
-                max_power_kW=float(row['max_power_kW']),
-                price_per_kWh=float(price_str)
-            )
-            charging_stations.append(station)
+        Returns:
+            Array with one distance in kilometers per station
+        """
+        point_array = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        distances = haversine_matrix(self.lat, self.lon, point_array[:, 0], point_array[:, 1])
+        return distances.min(axis=1)
+    
+    def select(self, mask: np.ndarray) -> List[ChargingStation]:
+        """
+        Get the stations where a boolean mask over the table is True
+        
+        Args:
+            mask: Boolean array with one entry per station
+            
+        Returns:
+            List of ChargingStation objects in table order
+        """
+        return [self.stations[i] for i in np.flatnonzero(mask)]
+
+
+def load_charging_station_table(file_path: str) -> ChargingStationTable:
+    """
+    Load charging stations from CSV file into a ChargingStationTable
     
-    return charging_stations
+    Args:
+        file_path: Path to the CSV file containing charging station data
+        
+    Returns:
+        ChargingStationTable over the loaded stations
+    """
+    return ChargingStationTable(load_charging_stations(file_path))
+
+
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Haversine distance between two sets of points
+    
+    Args:
+        lat1, lon1: Arrays of shape (n,) with the first set of points in degrees
+        lat2, lon2: Arrays of shape (m,) with the second set of points in degrees
+        
+    Returns:
+        Array of shape (n, m) with distances in kilometers
+    """
+    R = 6371.0
+    lat1_rad = np.radians(np.asarray(lat1, dtype=np.float64))[:, None]
+    lon1_rad = np.radians(np.asarray(lon1, dtype=np.float64))[:, None]
+    lat2_rad = np.radians(np.asarray(lat2, dtype=np.float64))[None, :]
+    lon2_rad = np.radians(np.asarray(lon2, dtype=np.float64))[None, :]
+    
+    a = np.sin((lat2_rad - lat1_rad) / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin((lon2_rad - lon1_rad) / 2)**2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
 
 def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
@@ -276,9 +367,28 @@ def compute_and_cache_station_distances(graph: nx.Graph, output_file: str = "gra
     with open('final_graph.json', 'w') as f:
         json.dump(graph.edges(), f, indent=2)
     
+    load_station_distance_cache.cache_clear()
+    
     print(f"Completed! Cached {len(distance_cache)} station pairs to {output_file}")
     return distance_cache
 
+@lru_cache(maxsize=None)
+def load_station_distance_cache(cache_file: str = "graph_computation.json") -> Dict[str, Any]:
+    """
+    Load the cached station-to-station route summaries once per process
+    
+    The file is ~1.4 MB, so parsing it on every distance lookup dominated
+    the optimizer's cost. Callers must treat the returned dict as read-only.
+    
+    Args:
+        cache_file: Path to the cached distances JSON file
+        
+    Returns:
+        Dictionary keyed by "<station1_id>_<station2_id>"
+    """
+    with open(cache_file, 'rb') as f:
+        return orjson.loads(f.read())
+
 def generate_graph(num_stations:int):
     stations = load_charging_stations("data/public_charge_points.csv")
     graph = build_charging_station_graph(stations[:num_stations])
@@ -297,8 +407,7 @@ def update_graph_weights(graph: nx.Graph, hourly_rate: float = 35.0) -> nx.Graph
         Updated graph with weights based on driver costs
     """
     # Load cached distances
-    with open('graph_computation.json', 'r') as f:
-        distance_cache = json.load(f)
+    distance_cache = load_station_distance_cache()
     
     # Update edge weights based on cached data
     for edge in graph.edges():
@@ -510,8 +619,7 @@ def visualize_shortest_route_map(graph: nx.Graph, path: List[int], output_file:
         output_file: Path to save the HTML map file
     """
     # Load cached route data
-    with open('graph_computation.json', 'r') as f:
-        distance_cache = json.load(f)
+    distance_cache = load_station_distance_cache()
     
     # Create map centered on the first station
     start_station = graph.nodes[path[0]]['station']
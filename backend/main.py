@@ -1,17 +1,30 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from typing import Dict, List, Tuple, Any
 import os
-import json
-from models import RouteRequest, RouteResult, Driver, SingleRouteRequest, SingleRouteResponse, SingleRouteWithSegments
+import asyncio
+import orjson
+import numpy as np
+from models import (
+    RouteRequest, RouteResult, Driver, ChargingStation, SingleRouteRequest, SingleRouteResponse, SingleRouteWithSegments,
+    DetailedRouteRequest, MultiRouteRequest
+)
+from tomtom import get_route
 from trucks import load_truck_specs
-from charging_stations import load_charging_stations
+from charging_stations import load_charging_stations, ChargingStationTable
 from route_calculator import calculate_detailed_route, calculate_multi_route
 from optimizer import optimize_routes
-from optily import plan_route
+from optily import make_planner
 
 app = FastAPI(title="E-Truck Routing Optimizer")
 
+# Totals compared between base and optimized routes in /multi-route
+COMPARISON_KEYS = ("total_cost", "total_duration", "total_energy", "total_distance")
+
+# Set DEBUG_DUMP_ROUTES=1 to write raw TomTom responses to <route_name>.json
+DEBUG_DUMP_ROUTES = os.getenv("DEBUG_DUMP_ROUTES", "0") == "1"
+
 # Enable CORS for local frontend
 app.add_middleware(
     CORSMiddleware,
@@ -29,17 +42,25 @@ app.add_middleware(
 # Load data at startup
 truck_specs = {}
 charging_stations = []
+station_table = ChargingStationTable([])
+station_by_id: dict[int, ChargingStation] = {}  # validated once at startup, shared by lookups
 drivers: dict[str, Driver] = {}
+planners = {}  # truck model -> planner bound to that truck and the loaded stations
 
 @app.on_event("startup")
 async def startup_event():
-    global truck_specs, charging_stations, drivers
+    global truck_specs, charging_stations, station_table, station_by_id, drivers, planners
     
     # Load truck specifications
     truck_specs = load_truck_specs("data/truck_specs.csv")
     
     # Load charging stations
     charging_stations = load_charging_stations("data/public_charge_points.csv")
+    station_table = ChargingStationTable(charging_stations)
+    station_by_id = {station.id: station for station in charging_stations}
+    
+    # Build one planner per truck model so requests skip reloading data
+    planners = {model: make_planner(model, spec, charging_stations) for model, spec in truck_specs.items()}
     
     # Load drivers (mock + from xlsx if available)
     try:
@@ -66,23 +87,56 @@ async def root():
     return {"message": "E-Truck Routing Optimizer API"}
 
 
+def _orjson_response(content: Any) -> Response:
+    """
+    Encode a plain dict/list result with orjson, skipping FastAPI's jsonable_encoder walk
+    
+    Endpoints with a response_model are already serialized by pydantic, so this
+    is only used for the endpoints that return large untyped dicts.
+    """
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        media_type="application/json"
+    )
+
+
+async def _stream_stations_json(stations: List):
+    """Yield a JSON array of stations one encoded entry at a time"""
+    yield b"["
+    first = True
+    for station in stations:
+        if not first:
+            yield b","
+        yield orjson.dumps(station.model_dump(mode='json'))
+        first = False
+    yield b"]"
+
+
 @app.get("/charging-stations")
 async def get_charging_stations(
     country: str = None,
     truck_suitable_only: bool = False,
     limit: int = 100
-) -> List:
+):
     """Get charging stations with optional filters"""
-    filtered = charging_stations
+    mask = np.ones(len(station_table), dtype=bool)
     
     if country:
-        filtered = [s for s in filtered if s.country == country]
+        mask &= station_table.country == country
     
     if truck_suitable_only:
-        filtered = [s for s in filtered if s.truck_suitability == "yes"]
+        mask &= station_table.truck_suitability == "yes"
+    
+    filtered = station_table.select(mask)
     
-    # Return limited number of stations
-    return [station.dict() for station in filtered[:limit]]
+    # Stream a limited number of stations instead of building every dict up front
+    return StreamingResponse(_stream_stations_json(filtered[:limit]), media_type="application/json")
+
+def _dump_route_json(path: str, route_data: Dict):
+    """Write raw route data to disk for debugging"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(route_data))
+
 
 @app.post("/get-optimal-route", response_model=SingleRouteResponse)
 async def get_optimal_route(request: SingleRouteRequest):
@@ -92,13 +146,12 @@ async def get_optimal_route(request: SingleRouteRequest):
         end_point = (request.end_lat, request.end_lng)
         route_name = request.route_name
         
-        # Call TomTom API
-        from tomtom import get_route
-        route_data = get_route(start_point, end_point)
+        # Call TomTom API in a worker thread so the blocking request doesn't stall the event loop
+        route_data = await asyncio.to_thread(get_route, start_point, end_point)
 
-        # export to json
-        with open(f"{route_name}.json", "w") as f:
-            json.dump(route_data, f)
+        # Export to json off the event loop, only when debugging
+        if DEBUG_DUMP_ROUTES:
+            await asyncio.to_thread(_dump_route_json, f"{route_name}.json", route_data)
         
         if not route_data:
             return SingleRouteResponse(
@@ -110,13 +163,11 @@ async def get_optimal_route(request: SingleRouteRequest):
                 message="Something went wrong. Could not calculate route"
             )
         
-        # Convert coordinates to the format expected by frontend
-        coordinates = []
-        for point in route_data["coordinates"]:
-            coordinates.append({
-                "lat": point["latitude"],
-                "lng": point["longitude"]
-            })
+        # Pack coordinates as (lat, lng) rows; the response serializes them to {"lat", "lng"} dicts
+        coordinates = np.array(
+            [(point["latitude"], point["longitude"]) for point in route_data["coordinates"]],
+            dtype=np.float64
+        ).reshape(-1, 2)
         
         return SingleRouteResponse(
             distance_km=route_data["distance"] / 1000,  # Convert meters to km
@@ -135,22 +186,22 @@ async def get_optimal_route(request: SingleRouteRequest):
 @app.get("/trucks")
 async def get_trucks() -> Dict:
     """Get available truck models"""
-    return {"trucks": [truck.dict() for truck in truck_specs.values()]}
+    return {"trucks": [truck.model_dump(mode='json') for truck in truck_specs.values()]}
 
     
 @app.get("/drivers")
 async def get_drivers() -> Dict:
-    return {k: v.dict() for k, v in drivers.items()}
+    return {k: v.model_dump(mode='json') for k, v in drivers.items()}
 
 
 @app.get("/charging-stations/{station_id}")
 async def get_charging_station(station_id: int):
     """Get details of a specific charging station"""
-    for station in charging_stations:
-        if station.id == station_id:
-            return station.dict()
+    station = station_by_id.get(station_id)
+    if station is None:
+        raise HTTPException(status_code=404, detail="Charging station not found")
     
-    raise HTTPException(status_code=404, detail="Charging station not found")
+    return station.model_dump(mode='json')
 
 
 @app.post("/route", response_model=RouteResult)
@@ -165,7 +216,7 @@ async def calculate_route(request: RouteRequest):
     
     # Find optimal route
     try:
-        result = find_optimal_route(request)
+        result = await asyncio.to_thread(find_optimal_route, request)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -191,7 +242,7 @@ async def optimize_route(request: RouteRequest):
     num_drivers = request.num_drivers or 1
     optimizer_drivers = []
     for i in range(num_drivers):
-        driver_id = request.driver_ids[i] if request.driver_ids and i < len(request.driver_ids) else i+1
+        driver_id = request.driver_ids[i] if request.driver_ids and i < len(request.driver_ids) else str(i+1)
         optimizer_drivers.append(Driver(
             id=driver_id, 
             name=f"Driver {driver_id}",
@@ -200,15 +251,23 @@ async def optimize_route(request: RouteRequest):
     
     try:
         # Run optimization
-        result = optimize_routes(routes, charging_stations, optimizer_drivers)
+        result = await asyncio.to_thread(optimize_routes, routes, charging_stations, optimizer_drivers)
+        
+        # Accumulate iteration totals in a single pass
+        total_duration = driving_duration = total_energy = total_cost = 0
+        for iteration in result["iterations"]:
+            total_duration += iteration["time_elapsed_minutes"] * 60
+            driving_duration += iteration.get("driving_time_seconds", 0)
+            total_energy += iteration.get("energy_consumption", 0)
+            total_cost += iteration["sum_cost"]
         
         # Convert result to RouteResult format
         route_result = RouteResult(
             total_distance=result["total_distance"] * 1000,  # convert km to meters
-            total_duration=sum(iter["time_elapsed_minutes"] * 60 for iter in result["iterations"]),
-            driving_duration=sum(iter.get("driving_time_seconds", 0) for iter in result["iterations"]),
-            total_energy_consumption=sum(iter.get("energy_consumption", 0) for iter in result["iterations"]),
-            total_cost=sum(iter["sum_cost"] for iter in result["iterations"]),
+            total_duration=total_duration,
+            driving_duration=driving_duration,
+            total_energy_consumption=total_energy,
+            total_cost=total_cost,
             route_segments=[],  # Would need to convert iterations to route segments
             driver_breaks=[],  # Would need to extract from iterations
             charging_stops=[],  # Would need to extract from iterations
@@ -232,9 +291,11 @@ async def calculate_costs(request: SingleRouteRequest, truck_model: str = None,
                 detail=f"Unknown truck model: {truck_model}. Available models: {list(truck_specs.keys())}"
             )
         
-        print("Driver salary: ", driver_salary, request)
         # Call the enhanced route planner
-        result = plan_route(request, truck_model, starting_battery_kwh, request.driver_salary)
+        if not truck_model:
+            truck_model = next(iter(planners))
+        planner = planners[truck_model]
+        result = await asyncio.to_thread(planner, request, starting_battery_kwh, request.driver_salary)
         
         if not result.success:
             raise HTTPException(status_code=400, detail=result.message)
@@ -257,18 +318,6 @@ async def health_check():
     }
 
 
-# Add new models for the detailed route API
-from pydantic import BaseModel
-from typing import List, Optional, Tuple
-
-class DetailedRouteRequest(BaseModel):
-    start_point: List[float]
-    end_point: List[float]
-    truck_type: Optional[str] = "electric"
-
-class MultiRouteRequest(BaseModel):
-    routes: List[DetailedRouteRequest]
-
 @app.post("/detailed-route")
 async def get_detailed_route(request: DetailedRouteRequest):
     """Calculate a route with detailed cost breakdown"""
@@ -276,13 +325,14 @@ async def get_detailed_route(request: DetailedRouteRequest):
         start_point = (request.start_point[0], request.start_point[1])
         end_point = (request.end_point[0], request.end_point[1])
         
-        result = calculate_detailed_route(
+        result = await asyncio.to_thread(
+            calculate_detailed_route,
             start_point=start_point,
             end_point=end_point,
             truck_type=request.truck_type
         )
         
-        return result
+        return _orjson_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -299,7 +349,7 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
                 "truck_type": route.truck_type
             })
         
-        base_result = calculate_multi_route(base_routes)
+        base_result = await asyncio.to_thread(calculate_multi_route, base_routes)
         
         # Step 2: Calculate optimized routes for each route separately
         for i, (route, base_route_result) in enumerate(zip(request.routes, base_result["routes"])):
@@ -312,12 +362,12 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
             # Create 2 drivers for optimization
             opt_drivers = [
                 Driver(
-                    id=1,
+                    id="1",
                     name="Driver 1",
                     home_location=(route.start_point[0], route.start_point[1])
                 ),
                 Driver(
-                    id=2,
+                    id="2",
                     name="Driver 2",
                     home_location=(route.start_point[0], route.start_point[1])
                 )
@@ -325,7 +375,13 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
             
             try:
                 # Run optimization for this single route
-                opt_result = optimize_routes(opt_route, charging_stations, opt_drivers)
+                opt_result = await asyncio.to_thread(optimize_routes, opt_route, charging_stations, opt_drivers)
+                
+                # Accumulate optimized totals in a single pass
+                opt_cost = opt_duration = 0
+                for iteration in opt_result.get("iterations", []):
+                    opt_cost += iteration.get("sum_cost", 0)
+                    opt_duration += iteration.get("time_elapsed_minutes", 0) * 60
                 
                 # Calculate route-specific comparison
                 route_comparison = {
@@ -336,8 +392,8 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
                         "total_distance": base_route_result["total_distance"]
                     },
                     "optimized": {
-                        "total_cost": sum(iter.get("sum_cost", 0) for iter in opt_result.get("iterations", [])),
-                        "total_duration": sum(iter.get("time_elapsed_minutes", 0) * 60 for iter in opt_result.get("iterations", [])),
+                        "total_cost": opt_cost,
+                        "total_duration": opt_duration,
                         "total_energy": opt_result.get("total_distance", 0) * 1.2,  # Estimate energy based on distance
                         "total_distance": opt_result.get("total_distance", 0) * 1000  # convert km to meters
                     }
@@ -360,20 +416,23 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
                 print(f"Error optimizing route {i}: {e}")
                 # Continue with other routes if one fails
         
-        # Step 3: Create overall comparison
+        # Step 3: Create overall comparison from column sums over all routes
+        routes = base_result["routes"]
+        base_energy = float(np.sum([r["total_energy_consumption"] for r in routes]))
+        optimized_values = np.array(
+            [[r["comparison"]["optimized"][key] for key in COMPARISON_KEYS] for r in routes if "comparison" in r],
+            dtype=float
+        ).reshape(-1, len(COMPARISON_KEYS))
+        optimized_totals = dict(zip(COMPARISON_KEYS, optimized_values.sum(axis=0).tolist()))
+        
         overall_comparison = {
             "base": {
                 "total_cost": base_result["total_cost"],
                 "total_duration": base_result["total_duration"],
-                "total_energy": sum(r["total_energy_consumption"] for r in base_result["routes"]),
+                "total_energy": base_energy,
                 "total_distance": base_result["total_distance"]
             },
-            "optimized": {
-                "total_cost": sum(r.get("comparison", {}).get("optimized", {}).get("total_cost", 0) for r in base_result["routes"]),
-                "total_duration": sum(r.get("comparison", {}).get("optimized", {}).get("total_duration", 0) for r in base_result["routes"]),
-                "total_energy": sum(r.get("comparison", {}).get("optimized", {}).get("total_energy", 0) for r in base_result["routes"]),
-                "total_distance": sum(r.get("comparison", {}).get("optimized", {}).get("total_distance", 0) for r in base_result["routes"])
-            }
+            "optimized": optimized_totals
         }
         
         # Calculate overall savings
@@ -389,7 +448,7 @@ async def calculate_multiple_routes(request: MultiRouteRequest):
         # Add overall comparison to result
         base_result["comparison"] = overall_comparison
         
-        return base_result
+        return _orjson_response(base_result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
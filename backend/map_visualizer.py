@@ -2,8 +2,215 @@ import folium
 from typing import List, Dict, Optional, Tuple
 import webbrowser
 import os
+import sys
+import threading
+import csv
 import json
 from folium import FeatureGroup
+from folium.plugins import FastMarkerCluster
+import numpy as np
+
+CHARGE_POINTS_FILE = "data/public_charge_points.csv"
+CHARGING_MARKER_RADIUS = 4  # pixels
+ROUTE_BBOX_BUFFER_DEG = 0.5  # degrees around the route bounding box to keep stations
+ROUTE_CORRIDOR_KM = 25  # max distance from the route for a station to be labelled
+EARTH_RADIUS_KM = 6371
+DISTANCE_CHUNK_SIZE = 2048  # stations per block when computing distances to the route
+
+# Leaflet callback turning a [lat, lon, popup] row into a canvas circle marker
+CHARGING_MARKER_CALLBACK = f"""
+function (row) {{
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+        radius: {CHARGING_MARKER_RADIUS}, color: 'blue', fill: true, fillOpacity: 0.7
+    }});
+    marker.bindPopup(row[2], {{maxWidth: 300}});
+    return marker;
+}}
+"""
+
+# Font Awesome (color, icon) per marker kind. folium.Icon objects belong to a
+# single marker, so only the specs are shared and icons are built per marker.
+ICON_SPECS = {
+    'start': ('green', 'play'),
+    'end': ('red', 'stop'),
+    'charging': ('blue', 'bolt'),
+    'break': ('orange', 'bed'),
+    'swap': ('pink', 'exchange'),
+    'short_break': ('orange', 'coffee'),
+    'long_rest': ('purple', 'bed'),
+    'default': ('purple', 'info'),
+}
+
+# HTML templates for report tooltips and summaries
+SEGMENT_TOOLTIP_TEMPLATE = """
+            <div style="width: 200px;">
+                <b>Route {route_number}, Segment {segment_number}</b><br>
+                <b>Driver:</b> {driver_id}<br>
+                Distance: {distance:.1f} km<br>
+                Time: {time_hours:.1f} hours<br>
+                Cost to Company: €{cost_to_company:.2f}<br>
+                Charging Cost: €{charging_cost:.2f}<br>
+                Sum Cost: €{sum_cost:.2f}
+            </div>
+            """
+
+SWAP_SUMMARY_HEADER = '''
+            <div style="position: fixed; 
+                        bottom: 150px; 
+                        right: 10px; 
+                        width: 260px; 
+                        background-color: white;
+                        padding: 10px;
+                        border-radius: 5px;
+                        border: 2px solid pink;
+                        z-index: 9999;">
+                <h4>Truck Swaps Summary</h4>
+        '''
+
+SWAP_SUMMARY_ENTRY_TEMPLATE = '''
+                <b>Swap {swap_number}:</b> Drivers {driver1_id} & {driver2_id}<br>
+                <b>Location:</b> Station {station_id}<br>
+                {details}
+                <hr style="margin: 5px 0;">
+            '''
+
+REPORT_LEGEND_HTML = '''
+        <div style="position: fixed; 
+                    bottom: 20px; 
+                    left: 10px; 
+                    width: 180px; 
+                    background-color: white;
+                    padding: 10px;
+                    border-radius: 5px;
+                    border: 2px solid gray;
+                    z-index: 9999;">
+            <h4>Legend</h4>
+            <div style="display: flex; align-items: center;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
+                <span>Start Point</span>
+            </div>
+            <div style="display: flex; align-items: center; margin-top: 5px;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
+                <span>End Point</span>
+            </div>
+            <div style="display: flex; align-items: center; margin-top: 5px;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: blue; margin-right: 5px;"></div>
+                <span>Charging Station</span>
+            </div>
+            <div style="display: flex; align-items: center; margin-top: 5px;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: pink; margin-right: 5px;"></div>
+                <span>Truck Swap</span>
+            </div>
+            <div style="display: flex; align-items: center; margin-top: 5px;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
+                <span>Short Break</span>
+            </div>
+            <div style="display: flex; align-items: center; margin-top: 5px;">
+                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: purple; margin-right: 5px;"></div>
+                <span>Long Rest</span>
+            </div>
+        </div>
+    '''
+
+# Charging station labels and their (lat, lon) positions, parsed from CHARGE_POINTS_FILE on first use
+_CHARGING_LABELS = None
+_CHARGING_POSITIONS = None
+
+
+def _load_charging_labels() -> List[Dict]:
+    """
+    Load charging station labels once and reuse them for every map render
+    
+    Returns:
+        List of label dicts with 'position', 'text' and 'type' keys
+    """
+    global _CHARGING_LABELS, _CHARGING_POSITIONS
+    if _CHARGING_LABELS is None:
+        labels = []
+        positions = []
+        with open(CHARGE_POINTS_FILE, 'r') as csvfile:
+            reader = csv.DictReader(csvfile)
+            for row in reader:
+                lat = float(row['latitude'])
+                lon = float(row['longitude'])
+                positions.append((lat, lon))
+                labels.append({
+                    'position': {'latitude': lat, 'longitude': lon},
+                    'text': f"{row['operator_name']} {row['price_€/kWh']} {row['truck_suitability']} {row['max_power_kW']}",
+                    'type': 'charging'
+                })
+        _CHARGING_LABELS = labels
+        _CHARGING_POSITIONS = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    return _CHARGING_LABELS
+
+
+def _min_distance_to_route_km(points: np.ndarray, route_points: np.ndarray, chunk_size: int = DISTANCE_CHUNK_SIZE) -> np.ndarray:
+    """
+    Great-circle distance from each point to its nearest route vertex
+    
+    Args:
+        points: Array of shape (m, 2) with (lat, lon) points
+        route_points: Array of shape (n, 2) with the route's (lat, lon) points
+        chunk_size: Number of points per broadcast block, bounding the (chunk, n) intermediates
+        
+    Returns:
+        Array of shape (m,) with distances in kilometers
+    """
+    route_lat = np.radians(route_points[:, 0])[None, :]
+    route_lon = np.radians(route_points[:, 1])[None, :]
+    cos_route_lat = np.cos(route_lat)
+    distances = np.empty(len(points), dtype=np.float64)
+    for start in range(0, len(points), chunk_size):
+        block = np.radians(points[start:start + chunk_size])
+        lat = block[:, 0:1]
+        lon = block[:, 1:2]
+        a = np.sin((route_lat - lat) / 2) ** 2 + np.cos(lat) * cos_route_lat * np.sin((route_lon - lon) / 2) ** 2
+        distances[start:start + chunk_size] = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a.min(axis=1)))
+    return distances
+
+
+def _charging_labels_near(route_points: np.ndarray, buffer_deg: float = ROUTE_BBOX_BUFFER_DEG, corridor_km: float = ROUTE_CORRIDOR_KM) -> List[Dict]:
+    """
+    Get the charging station labels within a corridor around the route
+    
+    Stations are first culled to the route's buffered bounding box, then to
+    those within corridor_km of a route point.
+    
+    Args:
+        route_points: Array of shape (n, 2) with the route's (lat, lon) points
+        buffer_deg: Margin in degrees added on every side of the bounding box
+        corridor_km: Maximum distance in kilometers from the route
+        
+    Returns:
+        List of label dicts for stations near the route
+    """
+    labels = _load_charging_labels()
+    lat_min, lon_min = route_points.min(axis=0) - buffer_deg
+    lat_max, lon_max = route_points.max(axis=0) + buffer_deg
+    lats = _CHARGING_POSITIONS[:, 0]
+    lons = _CHARGING_POSITIONS[:, 1]
+    mask = (lats >= lat_min) & (lats <= lat_max) & (lons >= lon_min) & (lons <= lon_max)
+    candidates = np.flatnonzero(mask)
+    distances = _min_distance_to_route_km(_CHARGING_POSITIONS[candidates], route_points)
+    return [labels[i] for i in candidates[distances <= corridor_km]]
+
+
+def _open_in_browser(output_file: str):
+    """
+    Open a saved map in the default browser without blocking the caller
+    
+    Skipped when stdout is not a terminal, so server and batch runs never launch a browser.
+    """
+    if not sys.stdout.isatty():
+        return
+    url = 'file://' + os.path.abspath(output_file)
+    threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
+
+
+def _icon(kind: str) -> folium.Icon:
+    """Create a Font Awesome marker icon for a kind listed in ICON_SPECS"""
+    color, icon = ICON_SPECS.get(kind, ICON_SPECS['default'])
+    return folium.Icon(color=color, icon=icon, prefix='fa')
 
 def plot_route(
     coordinates: List[Dict],
@@ -31,27 +238,19 @@ def plot_route(
         print("No coordinates provided to plot")
         return None
     
-    if plot_labels:
-        import pandas as pd
-        pd = pd.read_csv('/Users/ashish/Desktop/Hackathons/Libergy/babs/backend/data/public_charge_points.csv')
-        charging_labels = []
-        for index, row in pd.iterrows():
-            charging_labels.append({
-                'position': {'latitude': row['latitude'], 'longitude': row['longitude']},
-                'text': row['operator_name'] + ' ' + row['price_€/kWh'] + ' ' + row['truck_suitability'] + ' ' + str(row['max_power_kW']),
-                'type': 'charging'
-            })
-    labels = charging_labels
+    route_points = [(coord['latitude'], coord['longitude']) for coord in coordinates]
+    route_array = np.asarray(route_points, dtype=np.float64)
+    
+    # Only label stations around the route rather than the whole dataset
+    labels = _charging_labels_near(route_array) if plot_labels else []
     
     # Calculate center of the map
-    center_lat = sum(coord['latitude'] for coord in coordinates) / len(coordinates)
-    center_lon = sum(coord['longitude'] for coord in coordinates) / len(coordinates)
+    center_lat, center_lon = route_array.mean(axis=0).tolist()
     
-    # Create a map
-    route_map = folium.Map(location=[center_lat, center_lon], zoom_start=6)
+    # Create a map, drawing vector layers on a single canvas instead of per-marker SVG/DOM nodes
+    route_map = folium.Map(location=[center_lat, center_lon], zoom_start=6, prefer_canvas=True)
     
     # Add the route as a polyline
-    route_points = [(coord['latitude'], coord['longitude']) for coord in coordinates]
     folium.PolyLine(
         route_points,
         color='red',
@@ -64,17 +263,18 @@ def plot_route(
     folium.Marker(
         location=[coordinates[0]['latitude'], coordinates[0]['longitude']],
         popup='Start',
-        icon=folium.Icon(color='green', icon='play', prefix='fa')
+        icon=_icon('start')
     ).add_to(route_map)
     
     folium.Marker(
         location=[coordinates[-1]['latitude'], coordinates[-1]['longitude']],
         popup='End',
-        icon=folium.Icon(color='red', icon='stop', prefix='fa')
+        icon=_icon('end')
     ).add_to(route_map)
     
     # Add labels if provided
     if labels:
+        charging_rows = []
         for label in labels:
             # Skip if missing required fields
             if 'position' not in label or 'text' not in label:
@@ -84,23 +284,24 @@ def plot_route(
             text = label['text']
             label_type = label.get('type', 'default')
             
-            # Set icon based on label type
-            if label_type == 'start':
-                icon = folium.Icon(color='green', icon='play', prefix='fa')
-            elif label_type == 'end':
-                icon = folium.Icon(color='red', icon='stop', prefix='fa')
-            elif label_type == 'charging':
-                icon = folium.Icon(color='blue', icon='bolt', prefix='fa')
-            elif label_type == 'break':
-                icon = folium.Icon(color='orange', icon='bed', prefix='fa')
-            else:
-                icon = folium.Icon(color='purple', icon='info', prefix='fa')
+            # Charging stations are the bulk of labels; collect them for a single JS array
+            if label_type == 'charging':
+                charging_rows.append([position['latitude'], position['longitude'], text])
+                continue
             
-            # Add marker
+            # Add marker with the icon for its label type
             folium.Marker(
                 location=[position['latitude'], position['longitude']],
                 popup=folium.Popup(text, max_width=300),
-                icon=icon
+                icon=_icon(label_type)
+            ).add_to(route_map)
+        
+        # Cluster charging stations client-side so dense areas collapse into counts
+        if charging_rows:
+            FastMarkerCluster(
+                charging_rows,
+                callback=CHARGING_MARKER_CALLBACK,
+                name='Charging Stations'
             ).add_to(route_map)
     
     # Save the map to an HTML file
@@ -108,7 +309,7 @@ def plot_route(
     
     # Open the map in a browser if requested
     if open_browser:
-        webbrowser.open('file://' + os.path.abspath(output_file))
+        _open_in_browser(output_file)
     
     return os.path.abspath(output_file)
 
@@ -143,6 +344,15 @@ def visualize_report_json(
     driver_assignments = report.get('driver_assignments', [])
     truck_swaps = report.get('truck_swaps', [])
     
+    # Index assignments by route and swaps by (iteration, driver), keeping the first match
+    driver_by_route = {}
+    for assignment in driver_assignments:
+        driver_by_route.setdefault(assignment['route_id'], assignment['driver_id'])
+    swap_by_driver = {}
+    for swap in truck_swaps:
+        for driver_key in ('driver1_id', 'driver2_id'):
+            swap_by_driver.setdefault((swap.get('iteration'), swap.get(driver_key)), swap)
+    
     # Calculate map center based on all points
     all_points = []
     for route in routes:
@@ -152,8 +362,7 @@ def visualize_report_json(
             all_points.append(iteration['start_position'])
             all_points.append(iteration['end_position'])
     
-    center_lat = sum(p[0] for p in all_points) / len(all_points)
-    center_lon = sum(p[1] for p in all_points) / len(all_points)
+    center_lat, center_lon = np.asarray(all_points, dtype=np.float64)[:, :2].mean(axis=0).tolist()
     
     # Create map
     m = folium.Map(location=[center_lat, center_lon], zoom_start=6)
@@ -177,11 +386,7 @@ def visualize_report_json(
         end_coord = route['end_coord']
         
         # Find initial driver for this route
-        initial_driver_id = None
-        for assignment in driver_assignments:
-            if assignment['route_id'] == i:
-                initial_driver_id = assignment['driver_id']
-                break
+        initial_driver_id = driver_by_route.get(i)
         
         driver_text = f" (Driver {initial_driver_id})" if initial_driver_id else ""
         
@@ -189,7 +394,7 @@ def visualize_report_json(
         folium.Marker(
             location=start_coord,
             popup=f"Route {i+1} Start{driver_text}",
-            icon=folium.Icon(color='green', icon='play', prefix='fa')
+            icon=_icon('start')
         ).add_to(route_group)
         
         # Defer end marker until after segments so we can show final driver
@@ -198,6 +403,7 @@ def visualize_report_json(
         current_driver_id = initial_driver_id
         
         # Add route segments and charging stations
+        segment_features = []
         for j, iteration in enumerate(route.get('iterations', [])):
             start_pos = iteration['start_position']
             end_pos = iteration['end_position']
@@ -215,26 +421,26 @@ def visualize_report_json(
             total_distance += distance
 
             # Segment tooltip
-            segment_tooltip = f"""
-            <div style="width: 200px;">
-                <b>Route {i+1}, Segment {j+1}</b><br>
-                <b>Driver:</b> {current_driver_id}<br>
-                Distance: {distance:.1f} km<br>
-                Time: {time_hours:.1f} hours<br>
-                Cost to Company: €{cost_to_company:.2f}<br>
-                Charging Cost: €{charging_cost:.2f}<br>
-                Sum Cost: €{sum_cost:.2f}
-            </div>
-            """
+            segment_tooltip = SEGMENT_TOOLTIP_TEMPLATE.format(
+                route_number=i+1,
+                segment_number=j+1,
+                driver_id=current_driver_id,
+                distance=distance,
+                time_hours=time_hours,
+                cost_to_company=cost_to_company,
+                charging_cost=charging_cost,
+                sum_cost=sum_cost
+            )
             
-            # Draw route segment
-            folium.PolyLine(
-                locations=[start_pos, end_pos],
-                color=route_color,
-                weight=4,
-                opacity=0.8,
-                tooltip=segment_tooltip
-            ).add_to(route_group)
+            # Collect route segment (GeoJSON uses lon, lat order)
+            segment_features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[start_pos[1], start_pos[0]], [end_pos[1], end_pos[0]]]
+                },
+                'properties': {'tooltip': segment_tooltip}
+            })
             
             # Add charging station marker if available
             if 'charging_station' in iteration:
@@ -244,12 +450,7 @@ def visualize_report_json(
                 station_location = station.get('location', end_pos)
                 
                 # Check if there was a truck swap during this iteration
-                swap_info = None
-                for swap in truck_swaps:
-                    if (swap.get('iteration') == iteration.get('iteration') and 
-                        (current_driver_id == swap.get('driver1_id') or current_driver_id == swap.get('driver2_id'))):
-                        swap_info = swap
-                        break
+                swap_info = swap_by_driver.get((iteration.get('iteration'), current_driver_id))
                 
                 # Update current driver if there was a swap
                 if swap_info:
@@ -285,7 +486,7 @@ def visualize_report_json(
                     folium.Marker(
                         location=swap_location,
                         popup=folium.Popup(swap_popup, max_width=300),
-                        icon=folium.Icon(color='pink', icon='exchange', prefix='fa')
+                        icon=_icon('swap')
                     ).add_to(route_group)
                     
                     # Update current driver
@@ -304,15 +505,23 @@ def visualize_report_json(
                 folium.Marker(
                     location=station_location,
                     popup=folium.Popup(station_popup, max_width=300),
-                    icon=folium.Icon(color='blue', icon='bolt', prefix='fa')
+                    icon=_icon('charging')
                 ).add_to(route_group)
         
+        # Draw all segments of this route as one GeoJSON layer
+        if segment_features:
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': segment_features},
+                style_function=lambda feature, color=route_color: {'color': color, 'weight': 4, 'opacity': 0.8},
+                tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
+            ).add_to(route_group)
+        
         # After processing segments, add the end marker with the final driver
         final_driver_text = f" (Driver {current_driver_id})" if current_driver_id else ''
         folium.Marker(
             location=end_coord,
             popup=f"Route {i+1} End{final_driver_text}",
-            icon=folium.Icon(color='red', icon='stop', prefix='fa')
+            icon=_icon('end')
         ).add_to(route_group)
 
         # Add driver breaks
@@ -331,18 +540,10 @@ def visualize_report_json(
             </div>
             """
             
-            # Icon based on break type
-            if break_type == 'short_break':
-                icon_color = 'orange'
-                icon_name = 'coffee'
-            else:  # long_rest
-                icon_color = 'purple'
-                icon_name = 'bed'
-            
             folium.Marker(
                 location=break_location,
                 popup=folium.Popup(break_popup, max_width=300),
-                icon=folium.Icon(color=icon_color, icon=icon_name, prefix='fa')
+                icon=_icon('short_break' if break_type == 'short_break' else 'long_rest')
             ).add_to(route_group)
         
         # Add route summary box
@@ -372,6 +573,9 @@ def visualize_report_json(
         # Add the route group to the map
         route_group.add_to(m)
     
+    # Static HTML overlays (swap summary, legend), added to the map as one element
+    static_html = []
+    
     # Add truck swap summary if any swaps occurred
     if truck_swaps:
         # Dedupe swaps: collapse entries for the two iterations of the same swap
@@ -384,19 +588,7 @@ def visualize_report_json(
                 continue
             seen.add(key)
             deduped.append(swap)
-        swap_summary = f'''
-            <div style="position: fixed; 
-                        bottom: 150px; 
-                        right: 10px; 
-                        width: 260px; 
-                        background-color: white;
-                        padding: 10px;
-                        border-radius: 5px;
-                        border: 2px solid pink;
-                        z-index: 9999;">
-                <h4>Truck Swaps Summary</h4>
-        '''
-        
+        swap_summary_parts = [SWAP_SUMMARY_HEADER]
         for i, swap in enumerate(deduped):
             align_line = ''
             if 'alignment_dot' in swap and swap['alignment_dot'] is not None:
@@ -407,62 +599,29 @@ def visualize_report_json(
             detour_line = ''
             if 'detour_km_total' in swap and swap['detour_km_total']:
                 detour_line = f"<b>Total Detour:</b> {swap['detour_km_total']:.1f} km<br>"
-            swap_summary += f'''
-                <b>Swap {i+1}:</b> Drivers {swap['driver1_id']} & {swap['driver2_id']}<br>
-                <b>Location:</b> Station {swap['station_id']}<br>
-                {align_line}{reason_line}{detour_line}
-                <hr style="margin: 5px 0;">
-            '''
+            swap_summary_parts.append(SWAP_SUMMARY_ENTRY_TEMPLATE.format(
+                swap_number=i+1,
+                driver1_id=swap['driver1_id'],
+                driver2_id=swap['driver2_id'],
+                station_id=swap['station_id'],
+                details=align_line + reason_line + detour_line
+            ))
         
-        swap_summary += '</div>'
-        m.get_root().html.add_child(folium.Element(swap_summary))
+        swap_summary_parts.append('</div>')
+        static_html.append(''.join(swap_summary_parts))
     
     # Add legend
-    legend_html = f'''
-        <div style="position: fixed; 
-                    bottom: 20px; 
-                    left: 10px; 
-                    width: 180px; 
-                    background-color: white;
-                    padding: 10px;
-                    border-radius: 5px;
-                    border: 2px solid gray;
-                    z-index: 9999;">
-            <h4>Legend</h4>
-            <div style="display: flex; align-items: center;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
-                <span>Start Point</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-top: 5px;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
-                <span>End Point</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-top: 5px;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: blue; margin-right: 5px;"></div>
-                <span>Charging Station</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-top: 5px;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: pink; margin-right: 5px;"></div>
-                <span>Truck Swap</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-top: 5px;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
-                <span>Short Break</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-top: 5px;">
-                <div style="width: 20px; height: 20px; border-radius: 50%; background-color: purple; margin-right: 5px;"></div>
-                <span>Long Rest</span>
-            </div>
-        </div>
-    '''
-    m.get_root().html.add_child(folium.Element(legend_html))
+    static_html.append(REPORT_LEGEND_HTML)
+    
+    # Add all static overlays in one element
+    m.get_root().html.add_child(folium.Element(''.join(static_html)))
     
     # Save the map
     m.save(output_file)
     
     # Open in browser if requested
     if open_browser:
-        webbrowser.open('file://' + os.path.abspath(output_file))
+        _open_in_browser(output_file)
     
     return os.path.abspath(output_file)
 
@@ -1,10 +1,63 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Tuple, Dict
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, PlainValidator, WithJsonSchema
+from pydantic_core import to_jsonable_python
+from typing import Annotated, List, Literal, Optional, Tuple, Dict
+from dataclasses import dataclass, asdict
 from enum import Enum
+import numpy as np
+
+
+def _polyline(lat_key: str, lon_key: str):
+    """
+    Build a polyline field type stored as an (N, 2) float64 array of (lat, lon)
+    
+    Accepts an array, (lat, lon) pairs or dicts with lat_key/lon_key, and
+    serializes back to a list of {lat_key: ..., lon_key: ...} dicts.
+    """
+    def validate(value) -> np.ndarray:
+        if isinstance(value, np.ndarray):
+            return value.reshape(-1, 2)
+        pairs = [(point[lat_key], point[lon_key]) if isinstance(point, dict) else point for point in value]
+        return np.asarray(pairs, dtype=np.float64).reshape(-1, 2)
+
+    def serialize(value: np.ndarray) -> List[Dict[str, float]]:
+        return [{lat_key: lat, lon_key: lon} for lat, lon in value.tolist()]
+
+    schema = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {lat_key: {"type": "number"}, lon_key: {"type": "number"}}
+        }
+    }
+    return Annotated[
+        np.ndarray,
+        PlainValidator(validate),
+        PlainSerializer(serialize, return_type=List[Dict[str, float]]),
+        WithJsonSchema(schema)
+    ]
+
+
+# Polylines with the key names each response uses on the wire
+Polyline = _polyline("latitude", "longitude")
+LatLngPolyline = _polyline("lat", "lng")
+
+
+class DataclassDumpMixin:
+    """model_dump() shim so internal dataclasses serialize like the Pydantic models"""
+    __slots__ = ()
+
+    def model_dump(self, mode: str = 'python') -> Dict:
+        data = asdict(self)
+        if mode == 'json':
+            # Match BaseModel.model_dump(mode='json'): tuples become lists, enums their values
+            return to_jsonable_python(data)
+        return data
 
 
 class TruckModel(BaseModel):
     """Model representing truck specifications"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     manufacturer: str
     model: str
     battery_capacity: float  # in kWh
@@ -12,19 +65,26 @@ class TruckModel(BaseModel):
     range: float  # in km
 
 
+# Closed set of suitability values, validated by pydantic-core's literal lookup
+TruckSuitability = Literal["yes", "limited"]
+
+
 class ChargingStation(BaseModel):
     """Model representing a charging station"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: int
     country: str
     latitude: float
     longitude: float
-    truck_suitability: str  # "yes" or "limited"
+    truck_suitability: TruckSuitability
     operator_name: str
     max_power_kW: float
     price_per_kWh: float
 
 
-class RouteSegment(BaseModel):
+@dataclass(slots=True, frozen=True)
+class RouteSegment(DataclassDumpMixin):
     """Model representing a segment of the route"""
     start_point: Tuple[float, float]  # (latitude, longitude)
     end_point: Tuple[float, float]  # (latitude, longitude)
@@ -38,7 +98,8 @@ class DriverBreakType(str, Enum):
     LONG_REST = "long_rest"  # 11 hours rest
 
 
-class DriverBreak(BaseModel):
+@dataclass(slots=True, frozen=True)
+class DriverBreak(DataclassDumpMixin):
     """Model representing a driver break (used by route_calculator.py)"""
     break_type: DriverBreakType
     location: List[float]  # [latitude, longitude] as expected by route_calculator
@@ -46,19 +107,23 @@ class DriverBreak(BaseModel):
     duration: float  # in seconds
 
 
-class Driver(BaseModel):
+@dataclass(slots=True)
+class Driver(DataclassDumpMixin):
     """Simplified driver model with essential attributes"""
     id: str
     name: Optional[str] = None
-    current_location: Tuple[float, float]  # (latitude, longitude)
-    home_location: Tuple[float, float]  # (latitude, longitude)
+    current_location: Optional[Tuple[float, float]] = None  # (latitude, longitude), None until placed on a route
+    home_location: Optional[Tuple[float, float]] = None  # (latitude, longitude)
     mins_driven: float = 0.0  # Total minutes driven
     continuous_driving_minutes: float = 0.0  # Minutes driven since last break
     breaks_taken_min: float = 0.0  # Total minutes spent on breaks
+    current_truck_id: Optional[int] = None  # Route/truck index the optimizer assigned this driver to
 
 
 class DetailedDriverBreak(BaseModel):
     """Model representing a detailed driver break"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     break_number: int
     break_type: DriverBreakType
     location: Tuple[float, float]
@@ -68,7 +133,8 @@ class DetailedDriverBreak(BaseModel):
     charging_station: Optional[ChargingStation] = None
 
 
-class ChargingStop(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ChargingStop(DataclassDumpMixin):
     """Model representing a charging stop"""
     charging_station: ChargingStation
     arrival_battery_level: float  # in kWh
@@ -78,6 +144,16 @@ class ChargingStop(BaseModel):
     reason: Optional[str] = None
 
 
+class BatteryTraceEntry(BaseModel):
+    """Model representing the battery state at a point along the route"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    location: Tuple[float, float]  # (latitude, longitude)
+    time: float  # seconds from start of journey
+    battery_kwh: float
+    soc_percent: float
+
+
 class RouteResult(BaseModel):
     """Model representing the final route result"""
     total_distance: float  # in meters
@@ -90,7 +166,7 @@ class RouteResult(BaseModel):
     charging_stops: List[ChargingStop]
     nearby_charging_stations: List[ChargingStation] = []
     battery_capacity_kwh: Optional[float] = None
-    battery_trace: List[Dict] = []  # items: {"location": (lat,lon), "time": s, "battery_kwh": float, "soc_percent": float}
+    battery_trace: List[BatteryTraceEntry] = []
     feasible: bool  # whether the route is feasible with the given constraints
 
 
@@ -113,7 +189,8 @@ class SingleRouteRequest(BaseModel):
     route_name: Optional[str] = None
     driver_salary: Optional[float] = None
 
-class DetailedRouteSegment(BaseModel):
+@dataclass(slots=True, frozen=True)
+class DetailedRouteSegment(DataclassDumpMixin):
     """Model representing a detailed route segment with costs"""
     segment_number: int
     start_point: Tuple[float, float]  # (latitude, longitude)
@@ -121,12 +198,13 @@ class DetailedRouteSegment(BaseModel):
     distance_km: float
     duration_minutes: float
     energy_consumption_kwh: float
-    coordinates: List[Dict[str, float]]  # Route coordinates for this segment
+    coordinates: Polyline  # Route coordinates for this segment
     costs: Dict[str, float]  # Cost breakdown for this segment
     driver_id: Optional[str] = None  # Driver who drove this segment
 
 
-class DetailedChargingStop(BaseModel):
+@dataclass(slots=True, frozen=True)
+class DetailedChargingStop(DataclassDumpMixin):
     """Model representing a detailed charging stop"""
     stop_number: int
     charging_station: ChargingStation
@@ -137,7 +215,8 @@ class DetailedChargingStop(BaseModel):
     departure_battery_kwh: float
 
 
-class RouteCosts(BaseModel):
+@dataclass(slots=True, frozen=True)
+class RouteCosts(DataclassDumpMixin):
     """Model representing total route costs"""
     driver_cost_eur: float
     depreciation_cost_eur: float
@@ -149,7 +228,7 @@ class SingleRouteResponse(BaseModel):
     distance_km: float
     route_name: str
     duration_minutes: float
-    coordinates: List[Dict[str, float]]
+    coordinates: LatLngPolyline
     success: bool
     message: Optional[str] = None
 
@@ -171,3 +250,12 @@ class SingleRouteWithSegments(BaseModel):
     final_battery_kwh: Optional[float] = None
     eu_compliant: bool = True  # NEW: EU compliance flag
 
+
+# Request models for the detailed route API
+class DetailedRouteRequest(BaseModel):
+    start_point: List[float]
+    end_point: List[float]
+    truck_type: Optional[str] = "electric"
+
+class MultiRouteRequest(BaseModel):
+    routes: List[DetailedRouteRequest]
@@ -3,12 +3,13 @@ from models import (
     DetailedRouteSegment, DetailedChargingStop, RouteCosts, DetailedDriverBreak, 
     DriverBreakType, Driver
 )
-from charging_stations import load_charging_stations
+from charging_stations import load_charging_stations, ChargingStationTable
 from tomtom import get_route
-from typing import List, Optional, Dict, Tuple
-from trucks import load_truck_specs, calculate_energy_consumption, calculate_max_range
+from typing import List, NamedTuple, Optional, Dict, Tuple
+from functools import lru_cache
+from trucks import TRUCK_SPECS_FILE, load_truck_specs, calculate_energy_consumption, calculate_max_range
 import logging
-import math
+import numpy as np
 import uuid
 
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +21,31 @@ SHORT_BREAK_DURATION_HOURS = 0.75   # 45 minutes break duration
 MAX_DAILY_DRIVING_HOURS = 9.0       # Maximum daily driving hours
 LONG_REST_DURATION_HOURS = 11.0     # 11 hours mandatory rest
 
+# Bundled charging station data used by plan_route
+CHARGE_POINTS_FILE = "data/public_charge_points.csv"
+
+# TomTom route cache: entries kept, and coordinate decimals used as the cache key
+ROUTE_CACHE_SIZE = 4096
+ROUTE_CACHE_PRECISION = 5
+
+# Vehicle and driver costs in euros
+DEFAULT_DRIVER_SALARY = 35.0  # per hour, when the caller does not give one
+DEPRECIATION_PER_KM = 0.05
+TOLLS_PER_KM = 0.00  # EV trucks exempt from tolls in EU
+
+# Charging station score weights (lower score wins); power is currently ignored
+STATION_PRICE_WEIGHT = 1.0
+STATION_POWER_WEIGHT = 0.0
+
+# Leg range planning: keep 20% battery in reserve and aim for just under 4 hours of driving
+MIN_BATTERY_FRACTION = 0.20
+TARGET_LEG_DRIVING_HOURS = 4.0 - (10 / 60)  # 4 hour target minus 10 minutes tolerance, within the 4.5 hour limit
+AVERAGE_TRUCK_SPEED_KMH = 70.0  # conservative highway average for trucks
+TIME_LIMITED_RANGE_KM = TARGET_LEG_DRIVING_HOURS * AVERAGE_TRUCK_SPEED_KMH
+
+# Upper bound on charging legs per plan before giving up on the destination
+MAX_SEGMENTS = 11
+
 # Add new constant at the top with other EU constants
 MAX_DIRECT_DRIVING_HOURS = 4.0  # 4 hours with 30min margin for direct routes
 
@@ -39,81 +65,115 @@ def plan_route(request: SingleRouteRequest, truck_model: str = None, starting_ba
         driver breaks, and EU compliance information
     """
     try:
-        # Load data
-        charging_stations = load_charging_stations("data/public_charge_points.csv")
-        trucks = load_truck_specs("data/truck_specs.csv")
+        # Load data (parsed once per process)
+        charging_stations = _load_default_charging_stations()
         
         # Validate data
         if not charging_stations:
-            return _create_error_response(request, "No charging stations found")
-        
-        if not trucks:
-            return _create_error_response(request, "No truck specifications found")
+            return _create_error_response(request.route_name, "No charging stations found")
         
         # Select truck
+        truck_specs = _load_default_truck_specs()
         if truck_model is None:
-            truck_model = list(trucks.keys())[0]
-        
-        if truck_model not in trucks:
-            return _create_error_response(request, f"Truck model '{truck_model}' not found")
+            truck_model = next(iter(truck_specs), None)
+            if truck_model is None:
+                return _create_error_response(request.route_name, "No truck specifications found")
         
-        truck = trucks[truck_model]
-        
-        # Set starting battery charge
-        if starting_battery_kwh is None:
-            starting_battery_kwh = truck.battery_capacity
-        else:
-            starting_battery_kwh = min(starting_battery_kwh, truck.battery_capacity)
+        truck = truck_specs.get(truck_model)
+        if truck is None:
+            return _create_error_response(request.route_name, f"Truck model '{truck_model}' not found")
         
-        # Set driver salary (default to 35 if not provided)
-        if driver_salary is None:
-            driver_salary = 35
-        
-        # Plan route using EU-compliant approach
-        return _plan_eu_compliant_route(request, truck, charging_stations, starting_battery_kwh, truck_model, driver_salary)
+        planner = make_planner(truck_model, truck, charging_stations)
+        return planner(request, starting_battery_kwh, driver_salary)
             
     except Exception as e:
-        return _create_error_response(request, f"Error planning route: {str(e)}")
+        return _create_error_response(request.route_name, f"Error planning route: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def _load_default_charging_stations() -> List[ChargingStation]:
+    """Bundled charging stations, shared read-only by every plan_route call"""
+    return load_charging_stations(CHARGE_POINTS_FILE)
+
+
+@lru_cache(maxsize=1)
+def _load_default_truck_specs() -> Dict[str, TruckModel]:
+    """Bundled truck specifications, shared read-only by every plan_route call"""
+    return load_truck_specs(TRUCK_SPECS_FILE)
 
 
-def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, charging_stations: List[ChargingStation], starting_battery_kwh: float, truck_model: str, driver_salary: float) -> SingleRouteWithSegments:
+def make_planner(truck_model: str, truck: TruckModel, charging_stations: List[ChargingStation]):
+    """
+    Build a route planner bound to a single truck model and station list, so
+    callers that hold data loaded at startup can skip reloading it per request.
+    
+    Args:
+        truck_model: Name of the truck model
+        truck: TruckModel specification for that model
+        charging_stations: Charging stations available to the planner
+        
+    Returns:
+        Callable taking (request, starting_battery_kwh, driver_salary) and
+        returning a SingleRouteWithSegments, with the same defaults as plan_route
+    """
+    battery_capacity = truck.battery_capacity
+    station_table = ChargingStationTable(charging_stations)  # columnar copy for nearest-station queries
+    
+    def planner(request: SingleRouteRequest, starting_battery_kwh: float = None, driver_salary: float = None) -> SingleRouteWithSegments:
+        try:
+            # Set starting battery charge
+            if starting_battery_kwh is None:
+                starting_battery_kwh = battery_capacity
+            else:
+                starting_battery_kwh = min(starting_battery_kwh, battery_capacity)
+            
+            # Set driver salary (default to DEFAULT_DRIVER_SALARY if not provided)
+            if driver_salary is None:
+                driver_salary = DEFAULT_DRIVER_SALARY
+            
+            # Plan route using EU-compliant approach
+            return _plan_eu_compliant_route(
+                request.start_lat, request.start_lng, request.end_lat, request.end_lng, request.route_name,
+                truck, station_table, starting_battery_kwh, truck_model, driver_salary)
+        
+        except Exception as e:
+            return _create_error_response(request.route_name, f"Error planning route: {str(e)}")
+    
+    return planner
+
+
+def _plan_eu_compliant_route(start_lat: float, start_lng: float, end_lat: float, end_lng: float, route_name: Optional[str], truck: TruckModel, station_table: ChargingStationTable, starting_battery_kwh: float, truck_model: str, driver_salary: float) -> SingleRouteWithSegments:
     """
     EU-compliant route planning that respects driving time limits and mandatory breaks
+    
+    Takes plain coordinates rather than a SingleRouteRequest so internal callers
+    can plan routes without building and validating a request model per route.
     """
     route_segments = []
-    charging_stops = []
     detailed_segments = []
     detailed_charging_stops = []
     driver_breaks = []
     
-    total_costs = {
-        "driver_cost": 0,
-        "depreciation_cost": 0,
-        "tolls_cost": 0,
-        "charging_cost": 0
-    }
-    
     # Initialize simplified driver with essential attributes
     driver = Driver(
         id=str(uuid.uuid4()),
         name=f"Driver {str(uuid.uuid4())[:8]}",
-        current_location=(request.start_lat, request.start_lng),
-        home_location=(request.start_lat, request.start_lng),  # Assume home is start location
+        current_location=(start_lat, start_lng),
+        home_location=(start_lat, start_lng),  # Assume home is start location
         mins_driven=0.0,
         continuous_driving_minutes=0.0,
         breaks_taken_min=0.0
     )
     
     current_battery = starting_battery_kwh
-    current_position = (request.start_lat, request.start_lng)
-    destination = (request.end_lat, request.end_lng)
+    current_position = (start_lat, start_lng)
+    destination = (end_lat, end_lng)
     total_journey_time_minutes = 0.0
 
     MAX_ALLOWED_DIRECT_DRIVING_HOURS = 4.5
     
     # First check if destination is reachable directly with 80% battery
-    direct_distance = _get_route_distance(current_position, destination) # Calls tomtom api
-    direct_duration = _get_route_duration(current_position, destination) # Calls tomtom api
+    direct_distance, direct_duration = _get_route_distance_and_duration(current_position, destination) # Calls tomtom api
     if direct_distance > 0:
         energy_needed = calculate_energy_consumption(direct_distance, truck) # Calls trucks.py
         # Check if we can reach with 80% of battery capacity (safety margin) using a 4 hour window
@@ -124,13 +184,13 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
         
         if is_feasible_battery and is_feasible_eu_compliant:
             # Can reach destination directly!
-            print(f"Direct route possible: {direct_distance:.1f}km, Energy needed: {energy_needed:.1f}kWh, Current battery: {current_battery:.1f}kWh")
+            logger.debug("Direct route possible: %.1fkm, Energy needed: %.1fkWh, Current battery: %.1fkWh",
+                         direct_distance, energy_needed, current_battery)
             
             # Create direct route segment
             direct_segment = _create_route_segment(current_position, destination, truck)
             if direct_segment:
                 route_segments.append(direct_segment)
-                _add_segment_costs(direct_segment, total_costs, driver_salary)
 
                 # Update driver state for direct route
                 driver.mins_driven += direct_segment["duration_minutes"]
@@ -139,34 +199,15 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 total_journey_time_minutes += direct_segment["duration_minutes"]
                 
                 # Create detailed segment with driver assignment
-                detailed_segment = DetailedRouteSegment(
-                    segment_number=1,
-                    start_point=current_position,
-                    end_point=destination,
-                    distance_km=direct_segment["distance_km"],
-                    duration_minutes=direct_segment["duration_minutes"],
-                    energy_consumption_kwh=direct_segment["energy_consumption"],
-                    coordinates=direct_segment["coordinates"],
-                    costs=_calculate_segment_costs_dict(direct_segment, driver_salary),
-                    driver_id=driver.id
-                )
-                detailed_segments.append(detailed_segment)
+                detailed_segments.append(_create_detailed_segment(1, direct_segment, driver_salary, driver.id))
                 
-                # Create success message for direct route
-                message = _create_direct_route_success_message(truck, direct_segment, total_costs)
-                
-                # Create route costs object
-                route_costs = RouteCosts(
-                    driver_cost_eur=total_costs["driver_cost"],
-                    depreciation_cost_eur=total_costs["depreciation_cost"],
-                    tolls_cost_eur=total_costs["tolls_cost"],
-                    charging_cost_eur=total_costs["charging_cost"],
-                    total_cost_eur=sum(total_costs.values())
-                )
+                # Create route costs and success message for direct route
+                route_costs = _sum_route_costs(route_segments, detailed_charging_stops, driver_salary)
+                message = _create_direct_route_success_message(truck, direct_segment, route_costs)
                 
                 return SingleRouteWithSegments(
                     distance_km=direct_segment["distance_km"],
-                    route_name=request.route_name or f"{truck.manufacturer} {truck.model} Direct Route",
+                    route_name=route_name or f"{truck.manufacturer} {truck.model} Direct Route",
                     duration_minutes=direct_segment["duration_minutes"],
                     success=True,
                     message=message,
@@ -181,18 +222,13 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                     eu_compliant=True
                 )
         else:
-            print(f"Unfortunately, the direct route is not possible due to the following reasons: Battery: {is_feasible_battery}, EU compliance: {is_feasible_eu_compliant}")
+            logger.debug("Unfortunately, the direct route is not possible due to the following reasons: Battery: %s, EU compliance: %s",
+                         is_feasible_battery, is_feasible_eu_compliant)
     
     # If direct route not possible, proceed with charging station planning
-    segment_count = 0
     break_count = 0
     
-    while True:
-        if segment_count > 10:
-            break
-        
-        segment_count += 1
-        
+    for segment_count in range(1, MAX_SEGMENTS + 1):
         # Step 1: Calculate max range (until 20% battery remaining) in KM
         max_range_km = _calculate_max_range_until_20_percent(truck, current_battery)
         
@@ -200,20 +236,19 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
         max_range_point = _find_point_at_distance(current_position, destination, max_range_km)
         
         # Step 3: Find 5 closest charging stations to this max range point
-        candidate_stations = _find_closest_stations_to_point(max_range_point, charging_stations, num_candidates=5)
+        candidate_stations = _find_closest_stations_to_point(max_range_point, station_table, num_candidates=5)
         
         # Step 4: Select best station based on cost and power capacity
         best_station = _select_best_station_by_score(candidate_stations)
         
         if not best_station:
-            return _create_error_response(request, f"No suitable charging station found for segment {segment_count}")
+            return _create_error_response(route_name, f"No suitable charging station found for segment {segment_count}")
         
         # Step 5: Check if we can reach destination directly from this station
         station_position = (best_station.latitude, best_station.longitude)
-        direct_distance = _get_route_distance(station_position, destination)
-        direct_duration = _get_route_duration(station_position, destination)
+        direct_distance, direct_duration = _get_route_distance_and_duration(station_position, destination)
 
-        print("*********** Direct distance: ", direct_distance)
+        logger.debug("Direct distance from station: %s", direct_distance)
         
         if direct_distance > 0:
             is_feasible_eu_compliant = direct_duration <= (MAX_ALLOWED_DIRECT_DRIVING_HOURS * 60)
@@ -221,7 +256,8 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
             # Assume we charge to 80% at the station
             charged_battery = truck.battery_capacity * 0.8
 
-            print("*********** Charged battery: ", charged_battery, energy_needed, is_feasible_eu_compliant, direct_duration)
+            logger.debug("Charged battery: %s, energy needed: %s, EU compliant: %s, duration: %s",
+                         charged_battery, energy_needed, is_feasible_eu_compliant, direct_duration)
             
             if charged_battery >= energy_needed and is_feasible_eu_compliant:
                 # Can reach destination directly from this station!
@@ -229,7 +265,6 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 segment_to_station = _create_route_segment(current_position, station_position, truck)
                 if segment_to_station:
                     route_segments.append(segment_to_station)
-                    _add_segment_costs(segment_to_station, total_costs, driver_salary)
                 
                 # Update driver state
                 driver.mins_driven += segment_to_station["duration_minutes"]
@@ -238,20 +273,7 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 
                 # Add charging stop
                 charging_stop = _create_charging_stop(best_station, segment_count, current_battery, segment_to_station["energy_consumption"], truck)
-                charging_stops.append(charging_stop)
-                _add_charging_costs(charging_stop, total_costs)
-                
-                # Create detailed charging stop
-                detailed_charging_stop = DetailedChargingStop(
-                    stop_number=segment_count,
-                    charging_station=best_station,
-                    arrival_battery_kwh=charging_stop["arrival_battery"],
-                    energy_to_charge_kwh=charging_stop["energy_to_charge"],
-                    charging_time_hours=charging_stop["charging_time_hours"],
-                    charging_cost_eur=charging_stop["charging_cost"],
-                    departure_battery_kwh=truck.battery_capacity * 0.8
-                )
-                detailed_charging_stops.append(detailed_charging_stop)
+                detailed_charging_stops.append(charging_stop)
                 
                 # Update journey time with charging + break
                 total_station_time_minutes = _calculate_total_station_time(charging_stop) * 60  # Convert to minutes
@@ -259,25 +281,14 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 total_journey_time_minutes += total_station_time_minutes
                 
                 # Create detailed segment
-                detailed_segment = DetailedRouteSegment(
-                    segment_number=segment_count,
-                    start_point=current_position,
-                    end_point=station_position,
-                    distance_km=segment_to_station["distance_km"],
-                    duration_minutes=segment_to_station["duration_minutes"],
-                    energy_consumption_kwh=segment_to_station["energy_consumption"],
-                    coordinates=segment_to_station["coordinates"],
-                    costs=_calculate_segment_costs_dict(segment_to_station, driver_salary),
-                    driver_id=driver.id
-                )
-                detailed_segments.append(detailed_segment)
+                detailed_segments.append(_create_detailed_segment(segment_count, segment_to_station, driver_salary, driver.id))
 
                 charging_break = DetailedDriverBreak(
                     break_number=break_count,
                     break_type=DriverBreakType.SHORT_BREAK,
                     location=station_position,
                     start_time_minutes=total_journey_time_minutes,
-                    duration_minutes=max(charging_stop["charging_time_hours"] * 60, 45),
+                    duration_minutes=max(charging_stop.charging_time_hours * 60, 45),
                     reason=f"Charging break at {best_station.operator_name}",
                     charging_station=best_station
                 )
@@ -287,7 +298,6 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 final_segment = _create_route_segment(station_position, destination, truck)
                 if final_segment:
                     route_segments.append(final_segment)
-                    _add_segment_costs(final_segment, total_costs, driver_salary)
                 
                 # Update driver state for final segment
                 driver.mins_driven += final_segment["duration_minutes"]
@@ -296,42 +306,32 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
                 total_journey_time_minutes += final_segment["duration_minutes"]
                 
                 # Create detailed segment for final segment
-                final_detailed_segment = DetailedRouteSegment(
-                    segment_number=segment_count + 1,
-                    start_point=station_position,
-                    end_point=destination,
-                    distance_km=final_segment["distance_km"],
-                    duration_minutes=final_segment["duration_minutes"],
-                    energy_consumption_kwh=final_segment["energy_consumption"],
-                    coordinates=final_segment["coordinates"],
-                    costs=_calculate_segment_costs_dict(final_segment, driver_salary),
-                    driver_id=driver.id
-                )
-                detailed_segments.append(final_detailed_segment)
+                detailed_segments.append(_create_detailed_segment(segment_count + 1, final_segment, driver_salary, driver.id))
                 
-                print(f"Direct route to destination from {best_station.operator_name}")
-                print(f"  Distance: {direct_distance:.1f}km, Energy needed: {energy_needed:.1f}kWh")
-                print(f"  Charging at: {best_station.operator_name}")
-                print(f"  Final battery: {current_battery:.1f}kWh")
+                logger.debug("Direct route to destination from %s\n"
+                             "  Distance: %.1fkm, Energy needed: %.1fkWh\n"
+                             "  Final battery: %.1fkWh",
+                             best_station.operator_name, direct_distance, energy_needed, current_battery)
                 
                 break  # EXIT THE LOOP - WE'RE DONE!
         
         # Step 6: PREDICT segment duration BEFORE creating it (only if not reaching destination)
         predicted_distance = _get_route_distance(current_position, station_position)
-        predicted_duration_hours = predicted_distance / 70.0
+        predicted_duration_hours = predicted_distance / AVERAGE_TRUCK_SPEED_KMH
         predicted_duration_minutes = predicted_duration_hours * 60
 
-        print(f"PRED DURATION: {predicted_duration_minutes:.1f} minutes, break needed? {driver.continuous_driving_minutes + predicted_duration_minutes > MAX_CONTINUOUS_DRIVING_HOURS * 60}")
+        logger.debug("Predicted duration: %.1f minutes, break needed? %s", predicted_duration_minutes,
+                     driver.continuous_driving_minutes + predicted_duration_minutes > MAX_CONTINUOUS_DRIVING_HOURS * 60)
         
         # Step 7: Check EU compliance BEFORE creating segment
         # CORRECTED: Use continuous_driving_minutes directly
         if driver.continuous_driving_minutes + predicted_duration_minutes > MAX_CONTINUOUS_DRIVING_HOURS * 60:
             # Need mandatory break BEFORE this segment
             break_count += 1
-            break_location = _find_break_location(current_position, charging_stations)
+            break_location = _find_break_location(current_position, station_table)
             
             if not break_location:
-                return _create_error_response(request, f"No suitable break location found for segment {segment_count}")
+                return _create_error_response(route_name, f"No suitable break location found for segment {segment_count}")
             
             # Create mandatory break
             mandatory_break = DetailedDriverBreak(
@@ -353,14 +353,14 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
             # Add break costs: Assume they are not paid for the break
             # total_costs["driver_cost"] += 35.0 * (mandatory_break.duration_minutes / 60)
             
-            print(f"Mandatory break {break_count}: {mandatory_break.duration_minutes:.1f} minutes at {break_location['location']}")
+            logger.debug("Mandatory break %d: %.1f minutes at %s", break_count, mandatory_break.duration_minutes, break_location['location'])
         
         # Step 8: Check daily driving limit - IMPLEMENT MULTI-DAY PLANNING
         daily_driving_minutes = (MAX_DAILY_DRIVING_HOURS * 60) - driver.mins_driven    # Minutes since start of day
         if (daily_driving_minutes + predicted_duration_minutes) > (MAX_DAILY_DRIVING_HOURS * 60):
             # Need 11-hour mandatory rest for multi-day planning
             break_count += 1
-            break_location = _find_break_location(current_position, charging_stations)
+            break_location = _find_break_location(current_position, station_table)
             # Create 11-hour mandatory rest
             mandatory_rest = DetailedDriverBreak(
                 break_number=break_count,
@@ -382,16 +382,16 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
             driver.mins_driven = 0.0
             
             
-            print(f"Mandatory rest {break_count}: {mandatory_rest.duration_minutes:.1f} minutes at {current_position} (Multi-day planning)")
-            print(f"  New day starting - resetting driving counters")
+            logger.debug("Mandatory rest %d: %.1f minutes at %s (Multi-day planning)\n"
+                         "  New day starting - resetting driving counters",
+                         break_count, mandatory_rest.duration_minutes, current_position)
         
         # Step 9: NOW create the segment (compliance already checked)
         segment = _create_route_segment(current_position, station_position, truck)
         if not segment:
-            return _create_error_response(request, f"Failed to create route segment {segment_count}")
+            return _create_error_response(route_name, f"Failed to create route segment {segment_count}")
         
         route_segments.append(segment)
-        _add_segment_costs(segment, total_costs, driver_salary)
         
         # Update driver state
         driver.mins_driven += segment["duration_minutes"]
@@ -399,35 +399,11 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
         total_journey_time_minutes += segment["duration_minutes"]
         
         # Create detailed segment
-        detailed_segment = DetailedRouteSegment(
-            segment_number=segment_count,
-            start_point=current_position,
-            end_point=station_position,
-            distance_km=segment["distance_km"],
-            duration_minutes=segment["duration_minutes"],
-            energy_consumption_kwh=segment["energy_consumption"],
-            coordinates=segment["coordinates"],
-            costs=_calculate_segment_costs_dict(segment, driver_salary),
-            driver_id=driver.id
-        )
-        detailed_segments.append(detailed_segment)
+        detailed_segments.append(_create_detailed_segment(segment_count, segment, driver_salary, driver.id))
         
         # Add charging stop
         charging_stop = _create_charging_stop(best_station, segment_count, current_battery, segment["energy_consumption"], truck)
-        charging_stops.append(charging_stop)
-        _add_charging_costs(charging_stop, total_costs)
-        
-        # Create detailed charging stop
-        detailed_charging_stop = DetailedChargingStop(
-            stop_number=segment_count,
-            charging_station=best_station,
-            arrival_battery_kwh=charging_stop["arrival_battery"],
-            energy_to_charge_kwh=charging_stop["energy_to_charge"],
-            charging_time_hours=charging_stop["charging_time_hours"],
-            charging_cost_eur=charging_stop["charging_cost"],
-            departure_battery_kwh=truck.battery_capacity * 0.8
-        )
-        detailed_charging_stops.append(detailed_charging_stop)
+        detailed_charging_stops.append(charging_stop)
         
         # Update journey time with charging + break
         total_station_time_minutes = _calculate_total_station_time(charging_stop) * 60  # Convert to minutes
@@ -440,50 +416,30 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
         current_battery = truck.battery_capacity * 1.0  # Charge to 100%
         driver.current_location = current_position
         
-        print(f"Segment {segment_count}: {segment['distance_km']:.1f}km, "
-              f"Energy used: {segment['energy_consumption']:.1f}kWh, "
-              f"Charging at: {best_station.operator_name}")
-        print(f"  Driver: {driver.mins_driven:.1f} minutes driven, {driver.continuous_driving_minutes:.1f} continuous, {driver.breaks_taken_min:.1f} minutes breaks")
-        print(f"  Driver: {driver.mins_driven:.1f} minutes driven, {driver.breaks_taken_min:.1f} minutes breaks")
-
-        # Append to json file
-        with open('debug.json', 'a') as f:
-            f.write(f"Segment {segment_count}: {segment['distance_km']:.1f}km, "
-                    f"Energy used: {segment['energy_consumption']:.1f}kWh, "
-                    f"Charging at: {best_station.operator_name}\n")
-            f.write(f"  Driver: {driver.mins_driven:.1f} minutes driven, {driver.continuous_driving_minutes:.1f} continuous, {driver.breaks_taken_min:.1f} minutes breaks\n")
-            f.write(f"  Driver: {driver.mins_driven:.1f} minutes driven, {driver.breaks_taken_min:.1f} minutes breaks\n")
-            f.write(f"  Current location: {current_position} Destination: {destination}\n")
-            f.write(f"*"*100 + "\n\n")
-    
-    # Combine all coordinates from segments
-    all_coordinates = []
-    total_distance = 0
-    total_duration = 0
+        # Segment trace for debugging, only formatted when DEBUG logging is on
+        logger.debug(
+            "Segment %d: %.1fkm, Energy used: %.1fkWh, Charging at: %s\n"
+            "  Driver: %.1f minutes driven, %.1f continuous, %.1f minutes breaks\n"
+            "  Current location: %s Destination: %s",
+            segment_count, segment['distance_km'], segment['energy_consumption'], best_station.operator_name,
+            driver.mins_driven, driver.continuous_driving_minutes, driver.breaks_taken_min,
+            current_position, destination
+        )
+    else:
+        return _create_error_response(route_name, f"Destination not reached within {MAX_SEGMENTS} segments")
     
-    for segment in route_segments:
-        all_coordinates.extend(segment["coordinates"])
-        total_distance += segment["distance_km"]
-        total_duration += segment["duration_minutes"]
+    total_distance = sum(segment["distance_km"] for segment in route_segments)
     
     # Create success message
-    message = _create_eu_compliant_success_message(truck, route_segments, total_costs, charging_stops, driver_breaks, total_journey_time_minutes / 60)
-    
-    # Create route costs object
-    route_costs = RouteCosts(
-        driver_cost_eur=total_costs["driver_cost"],
-        depreciation_cost_eur=total_costs["depreciation_cost"],
-        tolls_cost_eur=total_costs["tolls_cost"],
-        charging_cost_eur=total_costs["charging_cost"],
-        total_cost_eur=sum(total_costs.values())
-    )
+    route_costs = _sum_route_costs(route_segments, detailed_charging_stops, driver_salary)
+    message = _create_eu_compliant_success_message(truck, route_segments, route_costs, detailed_charging_stops, driver_breaks, total_journey_time_minutes / 60)
     
     # Calculate final battery level
     final_battery = current_battery
     
     return SingleRouteWithSegments(
         distance_km=total_distance,
-        route_name=request.route_name or f"{truck.manufacturer} {truck.model} Route",
+        route_name=route_name or f"{truck.manufacturer} {truck.model} Route",
         duration_minutes=total_journey_time_minutes,  # Use total_journey_time_minutes instead of total_duration
         success=True,
         message=message,
@@ -499,12 +455,12 @@ def _plan_eu_compliant_route(request: SingleRouteRequest, truck: TruckModel, cha
     )
 
 
-def _find_break_location(current_position: Tuple[float, float], charging_stations: List[ChargingStation]) -> Optional[Dict]:
+def _find_break_location(current_position: Tuple[float, float], station_table: ChargingStationTable) -> Optional[Dict]:
     """
     Find a suitable location for a mandatory break, preferably at a charging station
     """
-    # First try to find a nearby charging station
-    nearby_stations = _find_closest_stations_to_point(current_position, charging_stations, num_candidates=3)
+    # First try to find a nearby charging station (only the nearest one is used)
+    nearby_stations = _find_closest_stations_to_point(current_position, station_table, num_candidates=1)
     
     if nearby_stations:
         best_station = nearby_stations[0]
@@ -532,40 +488,17 @@ def _calculate_max_range_until_20_percent(truck: TruckModel, current_battery: fl
     
     Returns the distance that can be covered in approximately 4 hours while respecting battery limits.
     """
-    MIN_BATTERY_PERCENT = 0.20
-    min_battery_kwh = truck.battery_capacity * MIN_BATTERY_PERCENT
-    usable_battery = current_battery - min_battery_kwh
+    usable_battery = current_battery - truck.battery_capacity * MIN_BATTERY_FRACTION
     
     if usable_battery <= 0:
         return 0.0
     
-    # EU driving regulation constraints
-    MAX_DRIVING_TIME_HOURS = 4.0  # Target 4 hours (within 4.5 hour limit)
-    TOLERANCE_MINUTES = 10  # ±10 minutes tolerance
-    MIN_DRIVING_TIME_HOURS = MAX_DRIVING_TIME_HOURS - (TOLERANCE_MINUTES / 60)  # 3.75 hours
-    MAX_DRIVING_TIME_HOURS_WITH_TOLERANCE = MAX_DRIVING_TIME_HOURS + (TOLERANCE_MINUTES / 60)  # 4.5 hours
-    
-    # Calculate battery-limited range
-    battery_limited_range = usable_battery / truck.consumption
-    
-    # Estimate time-limited range based on average truck speed
-    # Assuming average speed of 80 km/h for trucks on highways (conservative estimate)
-    AVERAGE_TRUCK_SPEED_KMH = 70.0
-    
-    # Calculate time-limited ranges for min and max driving times
-    min_time_range = MIN_DRIVING_TIME_HOURS * AVERAGE_TRUCK_SPEED_KMH
-    max_time_range = MAX_DRIVING_TIME_HOURS_WITH_TOLERANCE * AVERAGE_TRUCK_SPEED_KMH
-    
     # Use the more restrictive constraint (battery vs time)
-    # We want to stay within both battery and time limits
-    time_limited_range = min_time_range  # Use minimum time to be conservative
-    
-    # Return the smaller of battery-limited or time-limited range
-    max_range = min(battery_limited_range, time_limited_range)
+    battery_limited_range = usable_battery / truck.consumption
+    max_range = min(battery_limited_range, TIME_LIMITED_RANGE_KM)
     
-    print(f"Range calculation: Battery-limited={battery_limited_range:.1f}km, "
-          f"Time-limited={time_limited_range:.1f}km, "
-          f"Final range={max_range:.1f}km")
+    logger.debug("Range calculation: Battery-limited=%.1fkm, Time-limited=%.1fkm, Final range=%.1fkm",
+                 battery_limited_range, TIME_LIMITED_RANGE_KM, max_range)
     
     return max_range
 
@@ -576,173 +509,174 @@ def _find_point_at_distance(start_point: Tuple[float, float], end_point: Tuple[f
     Uses TomTom API route coordinates for accurate positioning
     """
     try:
-        # Get the full route from TomTom API
-        route_data = get_route(start_point, end_point, vehicle_type="truck", route_type="fastest")
+        # Get the full route from TomTom API (shared with the distance/duration lookups)
+        route_coordinates = _get_route_info(start_point, end_point).coordinates
         
-        if not route_data:
+        if len(route_coordinates) == 0:
             return start_point
         
-        # Extract route coordinates
-        route_coordinates = route_data["coordinates"]
-        
-        if not route_coordinates:
-            return start_point
-        
-        # Calculate cumulative distances along the route
-        cumulative_distance = 0.0
+        # Cumulative distances along the route, in meters, at the end of each polyline step
+        segment_distances = _polyline_step_distances(route_coordinates)
+        cumulative_distance = np.cumsum(segment_distances)
         target_distance_meters = distance_km * 1000  # Convert to meters
         
-        for i in range(len(route_coordinates) - 1):
-            current_point = route_coordinates[i]
-            next_point = route_coordinates[i + 1]
-            
-            # Calculate distance between consecutive points
-            segment_distance = _calculate_segment_distance(current_point, next_point)
-            
-            # Check if target distance falls within this segment
-            if cumulative_distance + segment_distance >= target_distance_meters:
-                # Find the exact point within this segment
-                remaining_distance = target_distance_meters - cumulative_distance
-                ratio = remaining_distance / segment_distance
-                
-                # Interpolate between current and next point
-                lat1, lon1 = current_point["latitude"], current_point["longitude"]
-                lat2, lon2 = next_point["latitude"], next_point["longitude"]
-                
-                interpolated_lat = lat1 + (lat2 - lat1) * ratio
-                interpolated_lon = lon1 + (lon2 - lon1) * ratio
-                
-                return (interpolated_lat, interpolated_lon)
-            
-            cumulative_distance += segment_distance
+        # First step whose end reaches the target distance
+        i = int(np.searchsorted(cumulative_distance, target_distance_meters, side="left"))
+        if i == len(segment_distances):
+            # If target distance exceeds total route, return end point
+            return (float(route_coordinates[-1, 0]), float(route_coordinates[-1, 1]))
+        
+        # Interpolate between the step's start and end point
+        remaining_distance = target_distance_meters - (cumulative_distance[i] - segment_distances[i])
+        ratio = remaining_distance / segment_distances[i] if segment_distances[i] > 0 else 0.0
+        lat1, lon1 = route_coordinates[i]
+        lat2, lon2 = route_coordinates[i + 1]
         
-        # If target distance exceeds total route, return end point
-        return (route_coordinates[-1]["latitude"], route_coordinates[-1]["longitude"])
+        return (float(lat1 + (lat2 - lat1) * ratio), float(lon1 + (lon2 - lon1) * ratio))
         
     except Exception as e:
-        print(f"Error finding point at distance: {e}")
+        logger.warning("Error finding point at distance: %s", e)
         return start_point
 
 
-def _calculate_segment_distance(point1: Dict, point2: Dict) -> float:
+def _polyline_step_distances(coordinates: np.ndarray) -> np.ndarray:
     """
-    Calculate distance between two route points using Haversine formula
+    Haversine distance in meters between consecutive points of an (N, 2) lat/lon array
     """
-    lat1, lon1 = point1["latitude"], point1["longitude"]
-    lat2, lon2 = point2["latitude"], point2["longitude"]
-    
-    # Haversine formula for accurate distance calculation
     R = 6371000  # Earth radius in meters
     
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    lat_rad = np.radians(coordinates[:, 0])
+    lon_rad = np.radians(coordinates[:, 1])
+    dlat = np.diff(lat_rad)
+    dlon = np.diff(lon_rad)
     
-    return R * c  # Distance in meters
+    a = np.sin(dlat / 2)**2 + np.cos(lat_rad[:-1]) * np.cos(lat_rad[1:]) * np.sin(dlon / 2)**2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
 
-def _find_closest_stations_to_point(target_point: Tuple[float, float], charging_stations: List[ChargingStation], num_candidates: int = 5) -> List[ChargingStation]:
+def _find_closest_stations_to_point(target_point: Tuple[float, float], station_table: ChargingStationTable, num_candidates: int = 5) -> List[ChargingStation]:
     """
     Find the closest charging stations to a target point using Euclidean distance
-    """
-    station_distances = []
-    
-    for station in charging_stations:
-        distance = _euclidean_distance(target_point, (station.latitude, station.longitude))
-        station_distances.append((station, distance))
     
-    # Sort by distance and take top candidates
-    station_distances.sort(key=lambda x: x[1])
-    candidates = [station for station, _ in station_distances[:num_candidates]]
-    
-    print(f"Found {len(candidates)} closest stations to target point")
-    for i, station in enumerate(candidates):
-        distance = station_distances[i][1]
-        print(f"  {i+1}. {station.operator_name} - {distance:.1f}km away")
+    Degrees are converted to km (1 degree ≈ 111 km, longitude scaled by 0.7 for
+    European latitudes) and all stations are evaluated at once.
+    """
+    lat_diff = (station_table.lat.astype(np.float64) - target_point[0]) * 111
+    lon_diff = (station_table.lon.astype(np.float64) - target_point[1]) * 111 * 0.7
+    distances = np.hypot(lat_diff, lon_diff)
+    
+    # Partial selection: keep every station within the k-th smallest distance,
+    # then stable-sort just those so ties keep table order as with a full sort
+    k = min(num_candidates, len(distances))
+    if 0 < k < len(distances):
+        kth_distance = np.partition(distances, k - 1)[k - 1]
+        pool = np.flatnonzero(distances <= kth_distance)
+    else:
+        pool = np.arange(len(distances))
+    nearest = pool[np.argsort(distances[pool], kind="stable")][:max(k, 0)]
+    candidates = [station_table[i] for i in nearest]
+    
+    # Candidate listing for debugging, only formatted when DEBUG logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Found %d closest stations to target point:%s", len(candidates),
+            "".join(f"\n  {i+1}. {station.operator_name} - {distances[nearest[i]]:.1f}km away" for i, station in enumerate(candidates))
+        )
     
     return candidates
 
 
+def _station_score(station: ChargingStation) -> float:
+    """
+    Score = (charging_cost_weight * price) + (power_weight / max_power)
+    Lower price and higher power = better (lower) score
+    """
+    cost_score = STATION_PRICE_WEIGHT * station.price_per_kWh
+    power_score = STATION_POWER_WEIGHT / station.max_power_kW if station.max_power_kW > 0 else float('inf')
+    return cost_score + power_score
+
+
 def _select_best_station_by_score(candidate_stations: List[ChargingStation]) -> Optional[ChargingStation]:
     """
     Select the best station based on cost and power capacity score
     Lower score is better
     """
-    if not candidate_stations:
+    # Candidate scores for debugging, only formatted when DEBUG logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        for station in candidate_stations:
+            logger.debug("Station %s: Cost=%.3f€/kWh, Power=%skW, Score=%.4f",
+                         station.operator_name, station.price_per_kWh, station.max_power_kW, _station_score(station))
+    
+    # min keeps the first of equally scored stations; stations without power never qualify
+    best_station = min(candidate_stations, key=_station_score, default=None)
+    if best_station is None or _station_score(best_station) == float('inf'):
         return None
     
-    best_station = None
-    best_score = float('inf')
-    
-    for station in candidate_stations:
-        # Score = (charging_cost_weight * price) + (power_weight / max_power)
-        # Lower price and higher power = better score
-        charging_cost_weight = 1.0  # 70% weight on cost
-        power_weight = 0.0  # 30% weight on power
-        
-        cost_score = charging_cost_weight * station.price_per_kWh
-        power_score = power_weight / station.max_power_kW if station.max_power_kW > 0 else float('inf')
-        
-        total_score = cost_score + power_score
-        
-        print(f"Station {station.operator_name}: Cost={station.price_per_kWh:.3f}€/kWh, "
-              f"Power={station.max_power_kW}kW, Score={total_score:.4f}")
-        
-        if total_score < best_score:
-            best_score = total_score
-            best_station = station
-    
-    if best_station:
-        print(f"Selected: {best_station.operator_name} with score {best_score:.4f}")
+    logger.debug("Selected: %s with score %.4f", best_station.operator_name, _station_score(best_station))
     
     return best_station
 
 
-def _create_charging_stop(station: ChargingStation, segment_count: int, current_battery: float, energy_used: float, truck: TruckModel) -> Dict:
+def _create_charging_stop(station: ChargingStation, segment_count: int, current_battery: float, energy_used: float, truck: TruckModel) -> DetailedChargingStop:
     """
     Create a charging stop record
+    
+    The same object is used for the planner's bookkeeping and returned in the
+    response, so each stop is built exactly once.
     """
     arrival_battery = current_battery - energy_used
-    energy_to_charge = (truck.battery_capacity * 0.8) - arrival_battery  # Charge to 80%
-    charging_cost = energy_to_charge * station.price_per_kWh
-    
-    return {
-        "station": station,
-        "segment": segment_count,
-        "arrival_battery": arrival_battery,
-        "energy_to_charge": energy_to_charge,
-        "charging_time_hours": energy_to_charge / station.max_power_kW if station.max_power_kW > 0 else 1.0,
-        "charging_cost": charging_cost
-    }
+    departure_battery = truck.battery_capacity * 0.8  # Charge to 80%
+    energy_to_charge = departure_battery - arrival_battery
+    
+    return DetailedChargingStop(
+        stop_number=segment_count,
+        charging_station=station,
+        arrival_battery_kwh=arrival_battery,
+        energy_to_charge_kwh=energy_to_charge,
+        charging_time_hours=energy_to_charge / station.max_power_kW if station.max_power_kW > 0 else 1.0,
+        charging_cost_eur=energy_to_charge * station.price_per_kWh,
+        departure_battery_kwh=departure_battery
+    )
 
 
-def _add_charging_costs(charging_stop: Dict, total_costs: Dict[str, float]):
-    """Add charging costs to total costs"""
-    total_costs["charging_cost"] += charging_stop["charging_cost"]
-    # Driver paid during charging + break time - PROBABLY NOT
-    # total_station_time = _calculate_total_station_time(charging_stop)
-    # total_costs["driver_cost"] += 35.0 * total_station_time
+class RouteInfo(NamedTuple):
+    """Routed distance, duration and polyline between two points"""
+    distance_km: float
+    duration_minutes: float
+    coordinates: np.ndarray  # (N, 2) lat/lon, read-only because it is shared through the cache
 
 
-def _euclidean_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _get_route_info_cached(start_lat: float, start_lng: float, end_lat: float, end_lng: float) -> RouteInfo:
     """
-    Calculate Euclidean distance between two points (rough approximation)
+    Fetch a truck route from TomTom once per coordinate pair
+    
+    Failed lookups raise instead of returning None so they are not cached.
     """
-    lat1, lon1 = point1
-    lat2, lon2 = point2
+    route_data = get_route((start_lat, start_lng), (end_lat, end_lng), vehicle_type="truck", route_type="fastest")
+    if not route_data:
+        raise RuntimeError(f"No route found from {(start_lat, start_lng)} to {(end_lat, end_lng)}")
+    
+    coordinates = np.array(
+        [(point["latitude"], point["longitude"]) for point in route_data["coordinates"]],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    coordinates.flags.writeable = False
     
-    # Rough conversion: 1 degree ≈ 111 km
-    lat_diff = (lat2 - lat1) * 111
-    lon_diff = (lon2 - lon1) * 111 * 0.7  # Adjust for longitude at European latitudes
+    return RouteInfo(route_data["distance"] / 1000, route_data["duration"] / 60, coordinates)
+
+
+def _get_route_info(start_point: Tuple[float, float], end_point: Tuple[float, float]) -> RouteInfo:
+    """
+    Get the cached route between two points
     
-    return (lat_diff**2 + lon_diff**2)**0.5
+    Coordinates are rounded to ROUTE_CACHE_PRECISION decimals (~1 m) so repeated
+    lookups of the same stations and positions share one TomTom request.
+    """
+    return _get_route_info_cached(
+        round(start_point[0], ROUTE_CACHE_PRECISION), round(start_point[1], ROUTE_CACHE_PRECISION),
+        round(end_point[0], ROUTE_CACHE_PRECISION), round(end_point[1], ROUTE_CACHE_PRECISION)
+    )
 
 
 def _get_route_distance(start_point: Tuple[float, float], end_point: Tuple[float, float]) -> float:
@@ -757,26 +691,25 @@ def _get_route_distance(start_point: Tuple[float, float], end_point: Tuple[float
         Distance in kilometers, or 0 if failed
     """
     try:
-        route_data = get_route(start_point, end_point, vehicle_type="truck", route_type="fastest")
-        
-        if route_data:
-            return route_data["distance"] / 1000
-        return 0.0
+        return _get_route_info(start_point, end_point).distance_km
         
     except Exception as e:
-        print(f"Error getting route distance: {e}")
+        logger.warning("Error getting route distance: %s", e)
         return 0.0
 
-def _get_route_duration(start_point: Tuple[float, float], end_point: Tuple[float, float]) -> float:
+def _get_route_distance_and_duration(start_point: Tuple[float, float], end_point: Tuple[float, float]) -> Tuple[float, float]:
     """
-    Get route duration using TomTom API
+    Get route distance and duration from a single route lookup
+    
+    Returns:
+        (distance in kilometers, duration in minutes), or (0, 0) if failed
     """
     try:
-        route_data = get_route(start_point, end_point, vehicle_type="truck", route_type="fastest")
-        return route_data["duration"] / 60
+        route_info = _get_route_info(start_point, end_point)
+        return route_info.distance_km, route_info.duration_minutes
     except Exception as e:
-        print(f"Error getting route duration: {e}")
-        return 0.0
+        logger.warning("Error getting route distance and duration: %s", e)
+        return 0.0, 0.0
 
 
 def _create_route_segment(start_point: Tuple[float, float], end_point: Tuple[float, float], truck: TruckModel) -> Optional[Dict]:
@@ -784,49 +717,80 @@ def _create_route_segment(start_point: Tuple[float, float], end_point: Tuple[flo
     Create a route segment between two points using TomTom API
     """
     try:
-        route_data = get_route(start_point, end_point, vehicle_type="truck", route_type="fastest")
-        
-        if not route_data:
-            return None
-        
-        coordinates = [
-            {"latitude": point["latitude"], "longitude": point["longitude"]}
-            for point in route_data["coordinates"]
-        ]
-        
-        distance_km = route_data["distance"] / 1000
-        duration_minutes = route_data["duration"] / 60
-        energy_consumption = calculate_energy_consumption(distance_km, truck)
+        route_info = _get_route_info(start_point, end_point)
+        energy_consumption = calculate_energy_consumption(route_info.distance_km, truck)
         
         return {
-            "coordinates": coordinates,
-            "distance_km": distance_km,
-            "duration_minutes": duration_minutes,
+            "coordinates": route_info.coordinates,
+            "distance_km": route_info.distance_km,
+            "duration_minutes": route_info.duration_minutes,
             "energy_consumption": energy_consumption,
             "start_point": start_point,
             "end_point": end_point
         }
         
     except Exception as e:
-        print(f"Error creating route segment: {e}")
+        logger.warning("Error creating route segment: %s", e)
         return None
 
 
-def _add_segment_costs(segment: Dict, total_costs: Dict[str, float], driver_salary: float):
-    """Add segment costs to total costs"""
-    duration_hours = segment["duration_minutes"] / 60
-    distance_km = segment["distance_km"]
-    
-    # Cost parameters
-    DRIVER_HOURLY_PAY = driver_salary
-    DEPRECIATION_PER_KM = 0.05
-    TOLLS_PER_KM = 0.00
+def _cost_weights(driver_salary: float) -> np.ndarray:
+    """
+    Cost coefficients as a (3, 2) matrix: rows are driver / depreciation / tolls
+    costs, columns are per driving hour and per km
+    """
+    return np.array([
+        [driver_salary, 0.0],
+        [0.0, DEPRECIATION_PER_KM],
+        [0.0, TOLLS_PER_KM],
+    ])
 
-    print("Using driver salary: ", DRIVER_HOURLY_PAY)
+
+def _sum_route_costs(route_segments: List[Dict], charging_stops: List[DetailedChargingStop], driver_salary: float) -> RouteCosts:
+    """
+    Calculate total route costs with one matrix product over all segments
     
-    total_costs["driver_cost"] += DRIVER_HOURLY_PAY * duration_hours
-    total_costs["depreciation_cost"] += DEPRECIATION_PER_KM * distance_km
-    total_costs["tolls_cost"] += TOLLS_PER_KM * distance_km
+    Args:
+        route_segments: Planner segment dicts with duration_minutes and distance_km
+        charging_stops: Charging stops made along the route
+        driver_salary: Driver hourly salary in euros
+        
+    Returns:
+        RouteCosts with the driver, depreciation, tolls and charging totals
+    """
+    # (2, Nseg) metrics: driving hours and km per segment
+    metrics = np.array(
+        [[segment["duration_minutes"] / 60 for segment in route_segments],
+         [segment["distance_km"] for segment in route_segments]],
+        dtype=np.float64
+    ).reshape(2, -1)
+    driver_cost, depreciation_cost, tolls_cost = (_cost_weights(driver_salary) @ metrics).sum(axis=1).tolist()
+    charging_cost = sum(stop.charging_cost_eur for stop in charging_stops)
+    
+    return RouteCosts(
+        driver_cost_eur=driver_cost,
+        depreciation_cost_eur=depreciation_cost,
+        tolls_cost_eur=tolls_cost,
+        charging_cost_eur=charging_cost,
+        total_cost_eur=driver_cost + depreciation_cost + tolls_cost + charging_cost
+    )
+
+
+def _create_detailed_segment(segment_number: int, segment: Dict, driver_salary: float, driver_id: str) -> DetailedRouteSegment:
+    """
+    Build the response segment for a planner segment dict, including its cost breakdown
+    """
+    return DetailedRouteSegment(
+        segment_number=segment_number,
+        start_point=segment["start_point"],
+        end_point=segment["end_point"],
+        distance_km=segment["distance_km"],
+        duration_minutes=segment["duration_minutes"],
+        energy_consumption_kwh=segment["energy_consumption"],
+        coordinates=segment["coordinates"],
+        costs=_calculate_segment_costs_dict(segment, driver_salary),
+        driver_id=driver_id
+    )
 
 
 def _calculate_segment_costs_dict(segment: Dict, driver_salary: float) -> Dict[str, float]:
@@ -834,14 +798,7 @@ def _calculate_segment_costs_dict(segment: Dict, driver_salary: float) -> Dict[s
     duration_hours = segment["duration_minutes"] / 60
     distance_km = segment["distance_km"]
     
-    # Cost parameters
-    DRIVER_HOURLY_PAY = driver_salary
-    DEPRECIATION_PER_KM = 0.05
-    TOLLS_PER_KM = 0.00
-
-    print("Using driver salary: ", DRIVER_HOURLY_PAY)
-    
-    driver_cost = DRIVER_HOURLY_PAY * duration_hours
+    driver_cost = driver_salary * duration_hours
     depreciation_cost = DEPRECIATION_PER_KM * distance_km
     tolls_cost = TOLLS_PER_KM * distance_km
     
@@ -853,117 +810,83 @@ def _calculate_segment_costs_dict(segment: Dict, driver_salary: float) -> Dict[s
     }
 
 
-def _create_eu_compliant_success_message(truck: TruckModel, route_segments: List[Dict], total_costs: Dict[str, float], charging_stops: List[Dict], driver_breaks: List[DetailedDriverBreak], total_journey_time_hours: float) -> str:
+def _create_eu_compliant_success_message(truck: TruckModel, route_segments: List[Dict], total_costs: RouteCosts, charging_stops: List[DetailedChargingStop], driver_breaks: List[DetailedDriverBreak], total_journey_time_hours: float) -> str:
     """Create success message for EU-compliant route"""
     total_distance = sum(segment["distance_km"] for segment in route_segments)
     total_duration = sum(segment["duration_minutes"] for segment in route_segments)
     
-    message = f"EU-Compliant Route planned successfully!\n"
-    message += f"Truck: {truck.manufacturer} {truck.model}\n"
-    message += f"Total distance: {total_distance:.1f} km\n"
-    message += f"Total driving time: {total_duration:.1f} minutes\n"
-    message += f"Total journey time: {total_journey_time_hours:.1f} hours (including charging + 45min breaks)\n"  # UPDATED
-    message += f"Number of segments: {len(route_segments)}\n"
-    message += f"Charging stops: {len(charging_stops)}\n"
-    message += f"Mandatory breaks: {len(driver_breaks)}\n\n"
+    lines = [
+        "EU-Compliant Route planned successfully!",
+        f"Truck: {truck.manufacturer} {truck.model}",
+        f"Total distance: {total_distance:.1f} km",
+        f"Total driving time: {total_duration:.1f} minutes",
+        f"Total journey time: {total_journey_time_hours:.1f} hours (including charging + 45min breaks)",
+        f"Number of segments: {len(route_segments)}",
+        f"Charging stops: {len(charging_stops)}",
+        f"Mandatory breaks: {len(driver_breaks)}",
+        "",
+    ]
     
     # Add segment details
     for i, segment in enumerate(route_segments, 1):
-        message += f"Segment {i}: {segment['distance_km']:.1f}km, "
-        message += f"{segment['duration_minutes']:.1f}min, "
-        message += f"{segment['energy_consumption']:.1f}kWh\n"
+        lines.append(f"Segment {i}: {segment['distance_km']:.1f}km, "
+                     f"{segment['duration_minutes']:.1f}min, "
+                     f"{segment['energy_consumption']:.1f}kWh")
     
     # Add charging stops
     if charging_stops:
-        message += "\nCharging stops:\n"
+        lines += ["", "Charging stops:"]
         for i, stop in enumerate(charging_stops, 1):
-            message += f"Stop {i}: {stop['station'].operator_name}, Stop_id: {stop['station'].id} "
-            message += f"Cost: €{stop['charging_cost']:.2f}, "
-            message += f"Power: {stop['station'].max_power_kW}kW\n"
+            lines.append(f"Stop {i}: {stop.charging_station.operator_name}, Stop_id: {stop.charging_station.id} "
+                         f"Cost: €{stop.charging_cost_eur:.2f}, "
+                         f"Power: {stop.charging_station.max_power_kW}kW")
     
     # Add driver breaks
     if driver_breaks:
-        message += "\nMandatory breaks:\n"
+        lines += ["", "Mandatory breaks:"]
         for i, break_obj in enumerate(driver_breaks, 1):
-            message += f"Break {i}: {break_obj.duration_minutes:.1f} minutes at {break_obj.location} - {break_obj.reason}\n"
+            lines.append(f"Break {i}: {break_obj.duration_minutes:.1f} minutes at {break_obj.location} - {break_obj.reason}")
     
-    # Add cost breakdown
-    message += f"\nCost breakdown:\n"
-    message += f"Driver: €{total_costs['driver_cost']:.2f}\n"
-    message += f"Depreciation: €{total_costs['depreciation_cost']:.2f}\n"
-    message += f"Tolls: €{total_costs['tolls_cost']:.2f}\n"
-    message += f"Charging: €{total_costs['charging_cost']:.2f}\n"
-    message += f"Total: €{sum(total_costs.values()):.2f}"
-    
-    return message
+    lines += _cost_breakdown_lines(total_costs)
+    return "\n".join(lines)
 
 
-def _create_direct_route_success_message(truck: TruckModel, segment: Dict, total_costs: Dict[str, float]) -> str:
+def _create_direct_route_success_message(truck: TruckModel, segment: Dict, total_costs: RouteCosts) -> str:
     """Create success message for direct route"""
-    total_distance = segment["distance_km"]
-    total_duration = segment["duration_minutes"]
-    
-    message = f"Direct EU-Compliant route planned successfully!\n"
-    message += f"Truck: {truck.manufacturer} {truck.model}\n"
-    message += f"Total distance: {total_distance:.1f} km\n"
-    message += f"Total duration: {total_duration:.1f} minutes\n"
-    message += f"Number of segments: 1\n"
-    message += f"Charging stops: 0\n"
-    message += f"Mandatory breaks: 0 (within {MAX_CONTINUOUS_DRIVING_HOURS}h limit)\n\n"
-    
-    message += f"Segment: {segment['distance_km']:.1f}km, "
-    message += f"{segment['duration_minutes']:.1f}min, "
-    message += f"{segment['energy_consumption']:.1f}kWh\n"
-    
-    message += f"\nCost breakdown:\n"
-    message += f"Driver: €{total_costs['driver_cost']:.2f}\n"
-    message += f"Depreciation: €{total_costs['depreciation_cost']:.2f}\n"
-    message += f"Tolls: €{total_costs['tolls_cost']:.2f}\n"
-    message += f"Charging: €{total_costs['charging_cost']:.2f}\n"
-    message += f"Total: €{sum(total_costs.values()):.2f}"
-    
-    return message
-
-
-def _calculate_route_costs(distance_km: float, duration_hours: float, energy_consumption_kwh: float, driver_salary: float) -> Dict[str, float]:
-    """
-    Calculate all route costs based on the detour_costs.csv structure
-    
-    Args:
-        distance_km: Total distance in kilometers
-        duration_hours: Total driving time in hours
-        energy_consumption_kwh: Total energy consumption in kWh (kept for compatibility but not used in cost calculation)
-        
-    Returns:
-        Dictionary with cost breakdown
-    """
-    # Cost parameters from detour_costs.csv
-    DRIVER_HOURLY_PAY = driver_salary  # €/h
-    DEPRECIATION_PER_KM = 0.05  # €/km (vehicle variable cost)
-    TOLLS_PER_KM = 0.00  # €/km (EV trucks exempt from tolls in EU)
-    
-    # Calculate individual cost components
-    driver_cost = DRIVER_HOURLY_PAY * duration_hours
-    depreciation_cost = DEPRECIATION_PER_KM * distance_km
-    tolls_cost = TOLLS_PER_KM * distance_km
-    
-    # Calculate total cost (energy cost removed to avoid double-counting with charging costs)
-    total_cost = driver_cost + depreciation_cost + tolls_cost
-    
-    return {
-        "driver_cost": driver_cost,
-        "depreciation_cost": depreciation_cost,
-        "tolls_cost": tolls_cost,
-        "total_cost": total_cost,
-        "cost_per_km": total_cost / distance_km if distance_km > 0 else 0
-    }
-
-
-def _create_error_response(request: SingleRouteRequest, message: str) -> SingleRouteWithSegments:
+    lines = [
+        "Direct EU-Compliant route planned successfully!",
+        f"Truck: {truck.manufacturer} {truck.model}",
+        f"Total distance: {segment['distance_km']:.1f} km",
+        f"Total duration: {segment['duration_minutes']:.1f} minutes",
+        "Number of segments: 1",
+        "Charging stops: 0",
+        f"Mandatory breaks: 0 (within {MAX_CONTINUOUS_DRIVING_HOURS}h limit)",
+        "",
+        f"Segment: {segment['distance_km']:.1f}km, {segment['duration_minutes']:.1f}min, {segment['energy_consumption']:.1f}kWh",
+    ]
+    
+    lines += _cost_breakdown_lines(total_costs)
+    return "\n".join(lines)
+
+
+def _cost_breakdown_lines(total_costs: RouteCosts) -> List[str]:
+    """Cost breakdown section shared by the success messages, preceded by a blank line"""
+    return [
+        "",
+        "Cost breakdown:",
+        f"Driver: €{total_costs.driver_cost_eur:.2f}",
+        f"Depreciation: €{total_costs.depreciation_cost_eur:.2f}",
+        f"Tolls: €{total_costs.tolls_cost_eur:.2f}",
+        f"Charging: €{total_costs.charging_cost_eur:.2f}",
+        f"Total: €{total_costs.total_cost_eur:.2f}",
+    ]
+
+
+def _create_error_response(route_name: Optional[str], message: str) -> SingleRouteWithSegments:
     """Helper function to create error responses"""
     return SingleRouteWithSegments(
         distance_km=0.0,
-        route_name=request.route_name or "Custom Route",
+        route_name=route_name or "Custom Route",
         duration_minutes=0.0,
         success=False,
         message=message,
@@ -979,11 +902,11 @@ def _create_error_response(request: SingleRouteRequest, message: str) -> SingleR
     )
 
 
-def _calculate_total_station_time(charging_stop: Dict) -> float:
+def _calculate_total_station_time(charging_stop: DetailedChargingStop) -> float:
     """
     Calculate total time spent at charging station including charging + mandatory break
     """
-    charging_time = charging_stop["charging_time_hours"]
+    charging_time = charging_stop.charging_time_hours
     break_time = 0.75  # 45 minutes = 0.75 hours
     # we take max time to avoid double counting
     return max(charging_time, break_time)
@@ -2,8 +2,9 @@ import json
 import networkx as nx
 from typing import List, Dict, Tuple, Any, Optional
 import math
+import numpy as np
 from models import ChargingStation, Driver
-from charging_stations import load_charging_stations, calculate_distance
+from charging_stations import load_charging_stations, calculate_distance, load_station_distance_cache, haversine_matrix, ChargingStationTable
 from tomtom import get_route
 
 # Constants
@@ -21,8 +22,7 @@ NEAR_RENDEZVOUS_RADIUS_KM = 300
 def get_distance_between_stations(station1_coords: Tuple[float, float], station2_coords: Tuple[float, float], charging_stations: List[ChargingStation]) -> float:
     """Get the distance between two stations"""
     try:
-        with open('graph_computation.json', 'r') as f:
-            distance_cache = json.load(f)
+        distance_cache = load_station_distance_cache()
 
         # find station ids from coords
         station1_id = next((station.id for station in charging_stations if station.latitude == station1_coords[0] and station.longitude == station1_coords[1]), None)
@@ -71,6 +71,9 @@ def optimize_routes(
         "truck_swaps": []
     }
     
+    # Columnar copy of the stations for vectorized next-station searches
+    station_table = ChargingStationTable(charging_stations)
+    
     # Initialize driver-truck assignments
     driver_assignments = []
     for i, (driver, route) in enumerate(zip(drivers, routes)):
@@ -142,7 +145,7 @@ def optimize_routes(
             next_station = find_optimal_next_station(
                 current_position,
                 end_coord,
-                charging_stations,
+                station_table,
                 TARGET_SEGMENT_DISTANCE,
                 DISTANCE_TOLERANCE
             )
@@ -313,7 +316,7 @@ def map_coords_to_charging_station(coords: Tuple[float, float], charging_station
 def find_optimal_next_station(
     start_position: Tuple[float, float],
     end_position: Tuple[float, float],
-    charging_stations: List[ChargingStation],
+    station_table: ChargingStationTable,
     target_distance: float,
     tolerance: float,
     alignment_threshold: float = ALIGNMENT_THRESHOLD
@@ -336,7 +339,7 @@ def find_optimal_next_station(
     Args:
         start_position: (latitude, longitude) of starting point
         end_position: (latitude, longitude) of final destination
-        charging_stations: List of available charging stations
+        station_table: Columnar table of available charging stations
         target_distance: Target segment distance in km
         tolerance: Distance tolerance in km
         
@@ -380,109 +383,54 @@ def find_optimal_next_station(
         )
         return destination_station
     
-    # Find all truck-suitable charging stations within the target distance range
-    candidate_stations = []
-    for station in charging_stations:
-        # Only consider truck-suitable stations
-        if station.truck_suitability != "yes":
-            continue
-            
-        station_position = (station.latitude, station.longitude)
-        distance_to_station = calculate_distance(start_position, station_position)
-        
-        # Skip stations that are too close or too far
-        if not (min_distance <= distance_to_station <= max_distance):
-            # If we're close to destination, consider stations closer than min_distance
-            if total_distance_to_destination < target_distance and distance_to_station < min_distance:
-                # Only consider stations that are in the direction of destination
-                pass
-            else:
-                continue
-        
-        # Calculate remaining distance to destination after this station
-        distance_from_station_to_destination = calculate_distance(station_position, end_position)
-        
-        # Calculate alignment with direction to destination
-        station_vector = (
-            station.latitude - start_position[0],
-            station.longitude - start_position[1]
-        )
-        
-        # Normalize station vector
-        station_vector_length = math.sqrt(station_vector[0]**2 + station_vector[1]**2)
-        if station_vector_length > 0:
-            station_vector = (
-                station_vector[0] / station_vector_length,
-                station_vector[1] / station_vector_length
-            )
-            
-        # Calculate dot product to measure alignment (1 = perfect alignment, -1 = opposite direction)
-        alignment = direction_vector[0] * station_vector[0] + direction_vector[1] * station_vector[1]
-        
-        # Only consider stations with reasonable alignment (at least 0.5, which is about 60 degrees)
-        if alignment > alignment_threshold:
-            # Calculate progress ratio: how much closer we get to destination by visiting this station
-            # Higher is better - means we're making more progress toward destination
-            progress = (total_distance_to_destination - distance_from_station_to_destination) / distance_to_station
-            
-            # Estimate charging cost (assuming average charging session of 80% battery at 350 kWh)
-            # This is a simplified model - in a real implementation you'd use the actual truck model
-            estimated_charging_cost = station.price_per_kWh * 280  # 80% of 350 kWh
-            
-            candidate_stations.append((station, distance_to_station, alignment, progress, estimated_charging_cost))
+    # Score every station at once over the table's columns
+    start_lat, start_lon = start_position
+    distance_to_station = haversine_matrix(station_table.lat, station_table.lon, [start_lat], [start_lon])[:, 0]
+    distance_from_station_to_destination = haversine_matrix(station_table.lat, station_table.lon, [end_position[0]], [end_position[1]])[:, 0]
+    
+    # Only consider truck-suitable stations within the target distance range;
+    # if we're close to destination, also consider stations closer than min_distance
+    truck_suitable = station_table.truck_suitability == "yes"
+    in_range = (min_distance <= distance_to_station) & (distance_to_station <= max_distance)
+    near_destination = (total_distance_to_destination < target_distance) & (distance_to_station < min_distance)
+    
+    # Calculate alignment with direction to destination (1 = perfect alignment, -1 = opposite direction)
+    station_vectors = np.stack((station_table.lat - start_lat, station_table.lon - start_lon)).astype(np.float64)
+    station_vector_lengths = np.hypot(station_vectors[0], station_vectors[1])
+    station_vectors /= np.where(station_vector_lengths > 0, station_vector_lengths, 1.0)
+    alignment = direction_vector[0] * station_vectors[0] + direction_vector[1] * station_vectors[1]
+    
+    # Only consider stations with reasonable alignment
+    candidates = np.flatnonzero(truck_suitable & (in_range | near_destination) & (alignment > alignment_threshold))
     
     # If no candidates found with strict criteria, try with relaxed alignment
-    if not candidate_stations:
-        for station in charging_stations:
-            if station.truck_suitability != "yes":
-                continue
-                
-            station_position = (station.latitude, station.longitude)
-            distance_to_station = calculate_distance(start_position, station_position)
-            
-            if min_distance <= distance_to_station <= max_distance:
-                # Calculate remaining distance to destination after this station
-                distance_from_station_to_destination = calculate_distance(station_position, end_position)
-                
-                # Calculate progress ratio
-                progress = (total_distance_to_destination - distance_from_station_to_destination) / distance_to_station
-                
-                # Estimate charging cost
-                estimated_charging_cost = station.price_per_kWh * 280  # 80% of 350 kWh
-                
-                candidate_stations.append((station, distance_to_station, 0, progress, estimated_charging_cost))
+    if candidates.size == 0:
+        candidates = np.flatnonzero(truck_suitable & in_range)
+    
+    if candidates.size == 0:
+        return None
+    
+    # Estimate charging cost (assuming average charging session of 80% battery at 350 kWh)
+    # This is a simplified model - in a real implementation you'd use the actual truck model
+    estimated_charging_cost = station_table.price[candidates].astype(np.float64) * 280  # 80% of 350 kWh
     
     # Sort by combined score: distance to destination + charging cost
-    # Normalize both factors to have comparable weights
-    if candidate_stations:
-        # Find max distance and max cost for normalization
-        max_distance = max(calculate_distance((s[0].latitude, s[0].longitude), end_position) for s in candidate_stations)
-        max_cost = max(s[4] for s in candidate_stations) if max(s[4] for s in candidate_stations) > 0 else 1
-        
-        # Calculate combined score for each station
-        for i, (station, distance, alignment, progress, cost) in enumerate(candidate_stations):
-            distance_to_dest = calculate_distance((station.latitude, station.longitude), end_position)
-            # Normalize both factors (0-1 range) and combine them
-            normalized_distance = distance_to_dest / max_distance if max_distance > 0 else 0
-            normalized_cost = cost / max_cost if max_cost > 0 else 0
-            # Combined score (lower is better)
-            combined_score = normalized_distance + normalized_cost
-            # Replace the tuple with updated one including the score
-            candidate_stations[i] = (station, distance, alignment, progress, cost, combined_score)
-        
-        # Sort by combined score (lower is better)
-        candidate_stations.sort(key=lambda x: x[5])
+    # Normalize both factors (0-1 range) to have comparable weights; lower is better
+    distance_to_dest = distance_from_station_to_destination[candidates]
+    max_distance = distance_to_dest.max()
+    max_cost = estimated_charging_cost.max() if estimated_charging_cost.max() > 0 else 1
+    normalized_distance = distance_to_dest / max_distance if max_distance > 0 else np.zeros(candidates.size)
+    combined_score = normalized_distance + estimated_charging_cost / max_cost
+    order = np.argsort(combined_score, kind="stable")
     
     # Print the top 3 candidate stations and their metrics
-    for station, distance, alignment, progress, cost, score in candidate_stations[:3]:
-        print(f"Station: {station.operator_name}, Score: {score:.2f}, Distance: {distance:.1f}, "
-              f"Cost: {cost:.2f}, Station ID: {station.id}")
+    for i in order[:3]:
+        station = station_table[candidates[i]]
+        print(f"Station: {station.operator_name}, Score: {combined_score[i]:.2f}, Distance: {distance_to_station[candidates[i]]:.1f}, "
+              f"Cost: {estimated_charging_cost[i]:.2f}, Station ID: {station.id}")
     
-    # Return the station with best combined score, or None if no suitable stations found
-    if candidate_stations:
-        return candidate_stations[0][0]
-    
-    return None
+    # Return the station with best combined score
+    return station_table[candidates[order[0]]]
 
 def save_optimization_results(results: Dict[str, Any], output_file: str = "optimization_results.json"):
     """Save optimization results to a JSON file"""
@@ -630,10 +578,10 @@ if __name__ == "__main__":
 
     # Example drivers (replace with actual driver data)
     drivers = [
-        Driver(id=1, name="Driver Lubeck", home_location=(stations[11].latitude, stations[11].longitude)),
-        Driver(id=2, name="Driver Ulm", home_location=(stations[10].latitude, stations[10].longitude)),
-        Driver(id=3, name="Fred Again", home_location=(stations[21].latitude, stations[21].longitude)),
-        Driver(id=4, name="Donnie Darko", home_location=(stations[16].latitude, stations[16].longitude)),
+        Driver(id="1", name="Driver Lubeck", home_location=(stations[11].latitude, stations[11].longitude)),
+        Driver(id="2", name="Driver Ulm", home_location=(stations[10].latitude, stations[10].longitude)),
+        Driver(id="3", name="Fred Again", home_location=(stations[21].latitude, stations[21].longitude)),
+        Driver(id="4", name="Donnie Darko", home_location=(stations[16].latitude, stations[16].longitude)),
     ]
 
     # Run optimization
@@ -1,8 +1,12 @@
 import json
+from functools import lru_cache
 from typing import List, Dict, Tuple, Any
 from tomtom import get_route
 from models import RouteSegment, RouteResult, DriverBreak, DriverBreakType, ChargingStop
-from charging_stations import load_charging_stations, calculate_distance
+from charging_stations import load_charging_station_table, ChargingStationTable
+
+# Bundled charging station data used by calculate_detailed_route
+CHARGE_POINTS_FILE = "data/public_charge_points.csv"
 
 # Constants for cost calculation
 DRIVER_HOURLY_WAGE = 35  # euros per hour
@@ -31,8 +35,8 @@ def calculate_detailed_route(
     Returns:
         Dictionary with route details and cost breakdown
     """
-    # Load charging stations
-    charging_stations = load_charging_stations("data/public_charge_points.csv")
+    # Load charging stations (parsed once per process)
+    station_table = _load_default_station_table()
     
     # Get route from TomTom API
     route_data = get_route(start_point, end_point)
@@ -66,7 +70,7 @@ def calculate_detailed_route(
         path_coordinates = [(start_point[0], start_point[1]), (end_point[0], end_point[1])]
     
     # Find nearby charging stations
-    nearby_stations = find_nearby_charging_stations(path_coordinates, charging_stations)
+    nearby_stations = find_nearby_charging_stations(path_coordinates, station_table)
     
     # Calculate driver cost based on duration
     driver_cost = DRIVER_HOURLY_WAGE * duration_hours
@@ -128,20 +132,24 @@ def calculate_detailed_route(
     
     return result
 
-def find_nearby_charging_stations(route_path, charging_stations, radius_km=50):
+@lru_cache(maxsize=1)
+def _load_default_station_table() -> ChargingStationTable:
+    """Bundled charging stations as a table, shared read-only by every calculate_detailed_route call"""
+    return load_charging_station_table(CHARGE_POINTS_FILE)
+
+
+def find_nearby_charging_stations(route_path, station_table, radius_km=50):
     """
     Find charging stations that are within a certain radius of the route path
     
     Args:
         route_path: List of (latitude, longitude) points along the route
-        charging_stations: List of charging station objects
+        station_table: ChargingStationTable of the charging stations to consider
         radius_km: Radius in kilometers to consider a station "nearby"
         
     Returns:
         List of nearby charging stations
     """
-    nearby_stations = []
-    
     # Sample the route path (don't check every point to improve performance)
     sample_rate = max(1, len(route_path) // 10)  # Sample about 10 points along the route
     sampled_path = [route_path[i] for i in range(0, len(route_path), sample_rate)]
@@ -152,16 +160,8 @@ def find_nearby_charging_stations(route_path, charging_stations, radius_km=50):
     if route_path[-1] not in sampled_path:
         sampled_path.append(route_path[-1])
     
-    # Check each charging station against sampled path points
-    for station in charging_stations:
-        station_pos = (station.latitude, station.longitude)
-        
-        # Check if station is within radius of any point on the sampled path
-        for point in sampled_path:
-            distance = calculate_distance(point, station_pos)
-            if distance <= radius_km:
-                nearby_stations.append(station)
-                break  # No need to check other path points for this station
+    # Check all charging stations against all sampled path points at once
+    nearby_stations = station_table.select(station_table.min_distance_km(sampled_path) <= radius_km)
     
     return nearby_stations
 
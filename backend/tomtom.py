@@ -1,11 +1,54 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
+import shelve
+import threading
+import time
 from dotenv import load_dotenv
 load_dotenv()
 
 TOMTOM_API_KEY = os.getenv("TOMTOM_API_KEY")
 
+# Connections kept open to api.tomtom.com (route requests also run in worker threads)
+TOMTOM_POOL_SIZE = 16
+
+# Shared session so repeated route requests reuse keep-alive connections instead of a new TLS handshake each
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=TOMTOM_POOL_SIZE, pool_maxsize=TOMTOM_POOL_SIZE))
+
+# Set TOMTOM_ROUTE_CACHE=<path> to persist get_route responses across restarts (off by default)
+TOMTOM_ROUTE_CACHE = os.getenv("TOMTOM_ROUTE_CACHE")
+# Cached routes include live traffic, so entries expire after this many seconds
+TOMTOM_ROUTE_CACHE_TTL = float(os.getenv("TOMTOM_ROUTE_CACHE_TTL", "86400"))
+
+# shelve files are not safe for concurrent access from the worker threads
+_ROUTE_CACHE_LOCK = threading.Lock()
+
+
+def _route_cache_key(start_point, end_point, vehicle_type, route_type):
+    """Cache key for a route request, with coordinates rounded to 5 decimals (~1 m)"""
+    return f"{start_point[0]:.5f},{start_point[1]:.5f}|{end_point[0]:.5f},{end_point[1]:.5f}|{vehicle_type}|{route_type}"
+
+
+def _read_route_cache(key):
+    """Return the cached route for key, or None if caching is off, missing or expired"""
+    if not TOMTOM_ROUTE_CACHE:
+        return None
+    with _ROUTE_CACHE_LOCK, shelve.open(TOMTOM_ROUTE_CACHE) as cache:
+        entry = cache.get(key)
+    if entry is None or time.time() - entry["stored_at"] > TOMTOM_ROUTE_CACHE_TTL:
+        return None
+    return entry["route"]
+
+
+def _write_route_cache(key, route):
+    """Store a route response in the persistent cache, if enabled"""
+    if not TOMTOM_ROUTE_CACHE:
+        return
+    with _ROUTE_CACHE_LOCK, shelve.open(TOMTOM_ROUTE_CACHE) as cache:
+        cache[key] = {"stored_at": time.time(), "route": route}
+
 def get_route(start_point, end_point, vehicle_type="truck", route_type: str = "fastest"):
     """
     Get route data between two points using TomTom Routing API
@@ -18,13 +61,17 @@ def get_route(start_point, end_point, vehicle_type="truck", route_type: str = "f
     Returns:
         dict: Route data including distance, duration, and coordinates
     """
+    cache_key = _route_cache_key(start_point, end_point, vehicle_type, route_type)
+    cached_route = _read_route_cache(cache_key)
+    if cached_route is not None:
+        return cached_route
+    
     if not TOMTOM_API_KEY:
         raise ValueError("TomTom API key not found. Set the TOMTOM_APIKEY environment variable.")
         
     # Format coordinates for API request
     start_coord = f"{start_point[0]},{start_point[1]}"
     end_coord = f"{end_point[0]},{end_point[1]}"
-    import time 
     time.sleep(0.5)
     
     # Build API URL
@@ -52,7 +99,7 @@ def get_route(start_point, end_point, vehicle_type="truck", route_type: str = "f
     
     try:
         # Make API request
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse and return route data
@@ -66,6 +113,7 @@ def get_route(start_point, end_point, vehicle_type="truck", route_type: str = "f
                 "coordinates": route_data["routes"][0]["legs"][0]["points"],
                 "full_response": route_data  # Include full response for additional data if needed
             }
+            _write_route_cache(cache_key, result)
             return result
         else:
             print("No routes found in the response")
@@ -126,7 +174,7 @@ def get_ev_route(start_point, end_point, current_charge_kWh, max_charge_kWh, con
     
     try:
         # Make API request
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse and return route data
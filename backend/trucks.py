@@ -2,6 +2,8 @@ import csv
 from typing import Dict, List, Optional
 from models import TruckModel
 
+TRUCK_SPECS_FILE = "data/truck_specs.csv"
+
 
 def load_truck_specs(file_path: str) -> Dict[str, TruckModel]:
     """